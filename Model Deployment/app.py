@@ -1,10 +1,34 @@
 import streamlit as st
-import tensorflow as tf
 import numpy as np
 from PIL import Image
 import io
-import time
-from datetime import datetime
+import os
+
+from inference import CASCADE_THRESHOLD as DEFAULT_CASCADE_THRESHOLD
+from inference import CLASS_NAMES, MODEL_PATH, BackgroundModelLoader, CascadeModel, preprocess_image
+from inference_client import InferenceClient
+from prediction_cache import PredictionCache, model_version
+from prediction_history import HistoryStore, PredictionHistory
+from serving_metrics import ServingMetrics
+
+# Set to e.g. http://127.0.0.1:8600 to send predictions to inference_server.py
+INFERENCE_SERVER_URL = os.environ.get("INFERENCE_SERVER_URL")
+# One of inference.INFERENCE_MODES; 'compiled' skips the Model.predict loop per request
+INFERENCE_MODE = os.environ.get("INFERENCE_MODE", "compiled")
+# Set to e.g. mobilenetv2_transfer_final.keras to answer with the small model first and escalate
+# low-confidence (< CASCADE_THRESHOLD) and high-risk predictions to the full model
+CASCADE_FAST_MODEL_PATH = os.environ.get("CASCADE_FAST_MODEL_PATH")
+CASCADE_THRESHOLD = float(os.environ.get("CASCADE_THRESHOLD", DEFAULT_CASCADE_THRESHOLD))
+# Prediction cache size, plus an optional directory shared by all app workers
+PREDICTION_CACHE_SIZE = int(os.environ.get("PREDICTION_CACHE_SIZE", "256"))
+PREDICTION_CACHE_DIR = os.environ.get("PREDICTION_CACHE_DIR")
+# Per-stage request metrics: a local /metrics endpoint, a textfile for scrapers and a JSON-lines trace log
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0")) or None
+METRICS_FILE = os.environ.get("METRICS_FILE")
+REQUEST_TRACE_LOG = os.environ.get("REQUEST_TRACE_LOG")
+# Predictions kept per session, plus an optional SQLite file recording every session's predictions
+PREDICTION_HISTORY_SIZE = int(os.environ.get("PREDICTION_HISTORY_SIZE", "500"))
+PREDICTION_HISTORY_DB = os.environ.get("PREDICTION_HISTORY_DB")
 
 # Configure page
 st.set_page_config(
@@ -571,8 +595,7 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Class names and comprehensive descriptions
-CLASS_NAMES = ['CaS', 'CoS', 'Gum', 'MC', 'OC', 'OLP', 'OT']
+# Class descriptions (class names are shared with the offline tools)
 CLASS_DESCRIPTIONS = {
     'CaS': 'Cold Sore (Herpes Simplex)',
     'CoS': 'Canker Sore (Aphthous Ulcer)', 
@@ -643,67 +666,92 @@ RISK_COLORS = {
     'High': '#f56565'
 }
 
+@st.cache_resource
+def get_history_store():
+    """SQLite prediction store shared by all sessions of this process"""
+    return HistoryStore(PREDICTION_HISTORY_DB) if PREDICTION_HISTORY_DB else None
+
 # Initialize session state
 if 'prediction_history' not in st.session_state:
-    st.session_state.prediction_history = []
+    st.session_state.prediction_history = PredictionHistory(PREDICTION_HISTORY_SIZE, store=get_history_store())
+# Every upload gets a new file ID and the uploader holds one file, so the latest ID is enough
+if 'recorded_upload' not in st.session_state:
+    st.session_state.recorded_upload = None
+if 'metrics_recorded_upload' not in st.session_state:
+    st.session_state.metrics_recorded_upload = None
 
 @st.cache_resource
+def start_model_loader():
+    """Start loading and warming up the model in the background (once per process)"""
+    # MODEL_PATH may point at a .tflite export or a SavedModel directory instead of the .keras file
+    model_path = os.environ.get("MODEL_PATH", MODEL_PATH)
+    return BackgroundModelLoader(model_path, INFERENCE_MODE, CASCADE_FAST_MODEL_PATH, CASCADE_THRESHOLD)
+
+@st.cache_resource(show_spinner=False)
 def load_model():
-    """Load the trained EfficientNetB0 model with progress tracking"""
+    """Wait for the background loader to deliver the trained EfficientNetB0 model"""
+    if INFERENCE_SERVER_URL:
+        return connect_inference_server(INFERENCE_SERVER_URL)
+
     try:
-        model_path = "efficientnetb0_transfer_final.keras"
+        loader = start_model_loader()
         
-        # Create a progress bar for model loading
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-        
-        status_text.text('🔄 Loading model architecture...')
-        progress_bar.progress(25)
-        
-        model = tf.keras.models.load_model(model_path)
-        
-        status_text.text('✅ Model loaded successfully!')
-        progress_bar.progress(100)
-        
-        time.sleep(0.5)  # Brief pause to show completion
-        progress_bar.empty()
-        status_text.empty()
-        
-        return model
+        if not loader.ready:
+            with st.spinner('🔄 Loading model...'):
+                return loader.result()
+        return loader.result()
     except Exception as e:
         st.error(f"❌ Error loading model: {str(e)}")
         st.info("📁 Please ensure the model file 'efficientnetb0_transfer_final.keras' is in the same directory as this app")
         return None
 
-def preprocess_image(image):
-    """Preprocess image for EfficientNetB0 model"""
-    # Convert to RGB if needed
-    if image.mode != 'RGB':
-        image = image.convert('RGB')
-    
-    # Store original size for display
-    original_size = image.size
-    
-    # Resize to model input size (256x256)
-    image = image.resize((256, 256))
-    
-    # Convert to numpy array and normalize
-    img_array = np.array(image)
-    img_array = np.expand_dims(img_array, axis=0)
-    
-    # Apply EfficientNet preprocessing
-    img_array = tf.keras.applications.efficientnet.preprocess_input(img_array)
-    
-    return img_array, original_size
+@st.cache_data(ttl=60, show_spinner=False)
+def server_model_version(url):
+    """Version of the model the inference server runs, re-checked every minute"""
+    return InferenceClient(url, timeout=5.0).health()['model_version']
+
+def current_model_version():
+    """Version of the model answering predictions, or None if the server cannot be reached"""
+    if INFERENCE_SERVER_URL:
+        try:
+            return f"server:{server_model_version(INFERENCE_SERVER_URL)}"
+        except Exception:
+            return None
+    version = model_version(os.environ.get("MODEL_PATH", MODEL_PATH))
+    if CASCADE_FAST_MODEL_PATH:
+        version += f"|cascade:{model_version(CASCADE_FAST_MODEL_PATH)}@{CASCADE_THRESHOLD}"
+    return version
+
+@st.cache_resource
+def get_prediction_cache(version):
+    """Process-wide cache of predictions keyed by image content and model version"""
+    return PredictionCache(version, max_entries=PREDICTION_CACHE_SIZE, disk_dir=PREDICTION_CACHE_DIR)
+
+@st.cache_resource
+def get_serving_metrics():
+    """Process-wide request metrics, exported once per process"""
+    return ServingMetrics(port=METRICS_PORT, metrics_file=METRICS_FILE, trace_log=REQUEST_TRACE_LOG)
 
-def predict_condition(model, image):
+def connect_inference_server(url):
+    """Use a shared micro-batching inference server instead of an in-process model"""
+    try:
+        client = InferenceClient(url)
+        client.health()
+        return client
+    except Exception as e:
+        st.error(f"❌ Cannot reach inference server at {url}: {str(e)}")
+        st.info("🖥️ Start it with 'python inference_server.py' or unset INFERENCE_SERVER_URL")
+        return None
+
+def predict_condition(model, image, trace):
     """Make prediction on the image with detailed results"""
     try:
-        # Preprocess image
-        processed_image, original_size = preprocess_image(image)
+        # Preprocess image (Image.open is lazy, so this includes decoding the pixels)
+        with trace.stage('preprocess'):
+            processed_image, original_size = preprocess_image(image)
         
         # Make prediction with progress tracking
-        with st.spinner("🔍 Analyzing image..."):
+        with st.spinner("🔍 Analyzing image..."), trace.stage('predict'):
             predictions = model.predict(processed_image, verbose=0)
         
         # Get predicted class and confidence
@@ -832,13 +880,45 @@ def create_sidebar():
     </div>
     """, unsafe_allow_html=True)
     
-    # Statistics
-    if st.session_state.prediction_history:
+    # Startup timing breakdown
+    if not INFERENCE_SERVER_URL and start_model_loader().ready:
+        timings = start_model_loader().timings
+        if timings:
+            st.sidebar.markdown("## ⏱️ Startup Timing")
+            rows = "".join(
+                f"<li><strong>{stage.replace('_', ' ').title()}:</strong> {seconds:.2f}s</li>"
+                for stage, seconds in timings.items()
+            )
+            st.sidebar.markdown(f"""
+            <div class="sidebar-section">
+                <ul>{rows}</ul>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    # Cascade escalation rate
+    if CASCADE_FAST_MODEL_PATH and not INFERENCE_SERVER_URL and start_model_loader().ready:
+        try:
+            model = start_model_loader().result()
+        except Exception:
+            model = None  # load_model() reports the error
+        if isinstance(model, CascadeModel) and model.images:
+            st.sidebar.markdown("## 🔀 Cascade")
+            st.sidebar.markdown(f"""
+            <div class="sidebar-section">
+                <ul>
+                    <li><strong>Threshold:</strong> {model.threshold:.0%}</li>
+                    <li><strong>Escalated to full model:</strong> {model.escalations}/{model.images} ({model.escalation_rate:.1%})</li>
+                </ul>
+            </div>
+            """, unsafe_allow_html=True)
+    
+    # Statistics (running aggregates, so the cost does not grow with the session)
+    history = st.session_state.prediction_history
+    if history:
         st.sidebar.markdown("## 📊 Session Statistics")
-        total_predictions = len(st.session_state.prediction_history)
-        avg_confidence = np.mean([pred['confidence'] for pred in st.session_state.prediction_history])
-        most_common = max(set([pred['class'] for pred in st.session_state.prediction_history]), 
-                         key=[pred['class'] for pred in st.session_state.prediction_history].count)
+        total_predictions = len(history)
+        avg_confidence = history.mean_confidence
+        most_common = history.most_common()
         
         st.sidebar.markdown(f"""
         <div class="stats-card">
@@ -858,6 +938,10 @@ def create_sidebar():
 def main():
     """Main application function"""
     
+    # Kick off model loading first so it overlaps with rendering the page
+    if not INFERENCE_SERVER_URL:
+        start_model_loader()
+    
     # Header
     st.markdown("""
     <div class="main-header">
@@ -871,13 +955,6 @@ def main():
     # Create sidebar
     create_sidebar()
     
-    # Load model
-    model = load_model()
-    
-    if model is None:
-        st.error("❌ Cannot proceed without model. Please check the model file.")
-        return
-    
     # File uploader
     st.markdown("## 📤 Upload Dental Image")
     uploaded_file = st.file_uploader(
@@ -887,41 +964,100 @@ def main():
     )
     
     if uploaded_file is not None:
-        # Display uploaded image
-        col1, col2 = st.columns([1, 2])
-        
-        with col1:
-            st.markdown("### 🖼️ Uploaded Image")
-            image = Image.open(uploaded_file)
-            st.image(image, caption="Uploaded Image", use_container_width=True)
+        # Reruns and repeated uploads of the same bytes are served from the cache
+        file_bytes = uploaded_file.getvalue()
+        metrics = get_serving_metrics()
+        # Any widget interaction reruns the script; only an upload's first run is a request
+        upload_id = getattr(uploaded_file, 'file_id', None) or (uploaded_file.name, uploaded_file.size)
+        first_run = upload_id != st.session_state.metrics_recorded_upload
+        trace = metrics.start_request(bytes=len(file_bytes))
+        outcome = 'error'
+        try:
+            # Without a known model version nothing is cached
+            version = current_model_version()
+            prediction_cache = get_prediction_cache(version) if version else None
+            cache_key, result = None, None
+            if prediction_cache is not None:
+                with trace.stage('cache_lookup'):
+                    cache_key = prediction_cache.make_key(file_bytes)
+                    result = prediction_cache.get(cache_key)
+            outcome = 'cache_hit' if result is not None else outcome
             
-            # Image details
-            st.markdown(f"""
-            <div class="stats-card">
-                <h4>Image Details</h4>
-                <p><strong>Format:</strong> {image.format}</p>
-                <p><strong>Size:</strong> {image.size[0]}×{image.size[1]}</p>
-                <p><strong>Mode:</strong> {image.mode}</p>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            # Make prediction
-            predicted_class, confidence, class_probabilities, top_3_predictions, original_size = predict_condition(model, image)
+            image = None
+            if result is None:
+                with trace.stage('image_open'):
+                    image = Image.open(io.BytesIO(file_bytes))
+                    image_info = {'format': image.format, 'size': list(image.size), 'mode': image.mode}
+            else:
+                image_info = result['image_info']
+            
+            # Display uploaded image
+            col1, col2 = st.columns([1, 2])
             
-            if predicted_class is not None:
-                # Display results
-                display_prediction_results(predicted_class, confidence, top_3_predictions)
+            with col1:
+                st.markdown("### 🖼️ Uploaded Image")
+                with trace.stage('image_display'):
+                    # Browsers cannot display TIFF, so those are re-encoded from the decoded image
+                    if image_info['format'] == 'TIFF':
+                        display_image = image if image is not None else Image.open(io.BytesIO(file_bytes))
+                    else:
+                        display_image = file_bytes
+                    st.image(display_image, caption="Uploaded Image", use_container_width=True)
                 
-                # Add to history
-                st.session_state.prediction_history.append({
-                    'class': predicted_class,
-                    'confidence': confidence,
-                    'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                })
+                # Image details
+                st.markdown(f"""
+                <div class="stats-card">
+                    <h4>Image Details</h4>
+                    <p><strong>Format:</strong> {image_info['format']}</p>
+                    <p><strong>Size:</strong> {image_info['size'][0]}×{image_info['size'][1]}</p>
+                    <p><strong>Mode:</strong> {image_info['mode']}</p>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            with col2:
+                if result is None:
+                    # The model is only awaited once there is something to predict
+                    with trace.stage('model_wait'):
+                        model = load_model()
+                    
+                    if model is None:
+                        st.error("❌ Cannot proceed without model. Please check the model file.")
+                        return
+                    
+                    # Make prediction
+                    predicted_class, confidence, class_probabilities, top_3_predictions, original_size = predict_condition(model, image, trace)
+                    
+                    if not INFERENCE_SERVER_URL:
+                        start_model_loader().record_prediction()
+                    
+                    if predicted_class is not None:
+                        result = {
+                            'predicted_class': predicted_class,
+                            'confidence': float(confidence),
+                            'top_3_predictions': [[name, float(prob)] for name, prob in top_3_predictions],
+                            'image_info': image_info,
+                        }
+                        if prediction_cache is not None:
+                            prediction_cache.put(cache_key, result)
+                        outcome = 'predicted'
                 
-                # Success message
-                st.success("✅ Analysis completed successfully!")
+                if result is not None:
+                    # Display results
+                    with trace.stage('render'):
+                        display_prediction_results(result['predicted_class'], result['confidence'], result['top_3_predictions'])
+                    
+                    # Add to history once per upload, not on every rerun
+                    if upload_id != st.session_state.recorded_upload:
+                        st.session_state.recorded_upload = upload_id
+                        st.session_state.prediction_history.add(result['predicted_class'], result['confidence'])
+                    
+                    # Success message
+                    st.success("✅ Analysis completed successfully!")
+        finally:
+            # Recorded whatever the outcome, so reruns after a failure are not counted again
+            if first_run:
+                st.session_state.metrics_recorded_upload = upload_id
+                metrics.finish_request(trace, outcome)
     
     # Prediction History
     if st.session_state.prediction_history:
@@ -929,19 +1065,24 @@ def main():
         
         # Create expandable history section
         with st.expander("View Previous Predictions", expanded=False):
-            for i, pred in enumerate(reversed(st.session_state.prediction_history[-10:])):  # Show last 10
+            for pred in st.session_state.prediction_history.recent(10):  # Show last 10
                 st.markdown(f"""
                 <div class="medical-info">
-                    <h4>Prediction #{len(st.session_state.prediction_history) - i}</h4>
+                    <h4>Prediction #{pred['number']}</h4>
                     <p><strong>Condition:</strong> {CLASS_DESCRIPTIONS[pred['class']]}</p>
                     <p><strong>Confidence:</strong> {pred['confidence']:.1%}</p>
                     <p><strong>Time:</strong> {pred['timestamp']}</p>
                 </div>
                 """, unsafe_allow_html=True)
         
+        # Export every recorded prediction from the persistent store (only queried on request)
+        store = st.session_state.prediction_history.store
+        if store is not None and st.checkbox("Export all recorded predictions"):
+            st.download_button("⬇️ Download CSV", store.to_csv(), file_name="prediction_history.csv", mime="text/csv")
+        
         # Clear history button
         if st.button("🗑️ Clear History"):
-            st.session_state.prediction_history = []
+            st.session_state.prediction_history.clear()
             st.success("History cleared!")
             st.experimental_rerun()
     
@@ -0,0 +1,199 @@
+"""
+Headless batch inference for the dental pathology classifier.
+
+Scores every image found in the given directories, glob patterns or manifest
+files and writes one row per image with per-class probabilities.
+
+Usage:
+    python batch_predict.py /data/clinic_a "/data/clinic_b/**/*.jpg" manifest.txt \
+        --output results.csv --batch-size 64
+"""
+
+import argparse
+import csv
+import glob
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from inference import (
+    CLASS_NAMES,
+    IMAGE_EXTENSIONS,
+    INFERENCE_MODES,
+    MODEL_PATH,
+    BatchPreprocessor,
+    load_inference_model,
+)
+
+MANIFEST_EXTENSIONS = ('.txt', '.csv')
+
+
+def read_manifest(manifest_path):
+    """Read image paths from a manifest (one path per line, or a CSV with a 'path' column)"""
+    base_dir = os.path.dirname(os.path.abspath(manifest_path))
+
+    with open(manifest_path, newline='') as f:
+        if manifest_path.lower().endswith('.csv'):
+            paths = [row['path'] for row in csv.DictReader(f)]
+        else:
+            paths = [line.strip() for line in f if line.strip() and not line.startswith('#')]
+
+    # Relative entries are resolved against the manifest location
+    return [p if os.path.isabs(p) else os.path.join(base_dir, p) for p in paths]
+
+
+def collect_image_paths(inputs):
+    """Expand directories, glob patterns and manifest files into a sorted list of image paths"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, files in os.walk(item):
+                paths.extend(
+                    os.path.join(root, name)
+                    for name in files
+                    if name.lower().endswith(IMAGE_EXTENSIONS)
+                )
+        elif os.path.isfile(item) and item.lower().endswith(MANIFEST_EXTENSIONS):
+            paths.extend(read_manifest(item))
+        elif os.path.isfile(item):
+            paths.append(item)
+        else:
+            matches = glob.glob(item, recursive=True)
+            if not matches:
+                raise FileNotFoundError(f"No images found for input: {item}")
+            paths.extend(p for p in matches if p.lower().endswith(IMAGE_EXTENSIONS))
+
+    # Drop duplicates while keeping a stable order
+    return sorted(set(paths))
+
+
+def _safe_load(preprocessor, index, path):
+    """Decode a single image into its batch row, returning an error message instead of raising"""
+    try:
+        preprocessor.load_file(index, path)
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def iter_batches(paths, batch_size, executor):
+    """
+    Yield (batch_paths, batch_array, rows, errors) with images decoded in parallel.
+
+    Images are decoded straight into one of two preallocated batch buffers:
+    while the caller runs inference on one, the next chunk is decoded into the
+    other. The batch array always has the full (batch_size, 256, 256, 3) shape
+    so the model sees a single static input shape; `rows` lists the buffer
+    rows that hold the successfully decoded `batch_paths`.
+    """
+    chunks = [paths[i:i + batch_size] for i in range(0, len(paths), batch_size)]
+    if not chunks:
+        return
+
+    buffers = [BatchPreprocessor(batch_size), BatchPreprocessor(batch_size)]
+
+    def submit(chunk, preprocessor):
+        return [executor.submit(_safe_load, preprocessor, i, p) for i, p in enumerate(chunk)]
+
+    pending = submit(chunks[0], buffers[0])
+    for idx, chunk in enumerate(chunks):
+        load_errors = [future.result() for future in pending]
+        if idx + 1 < len(chunks):
+            pending = submit(chunks[idx + 1], buffers[(idx + 1) % 2])
+
+        batch_paths, rows, errors = [], [], []
+        for row, (path, error) in enumerate(zip(chunk, load_errors)):
+            if error is not None:
+                errors.append((path, error))
+                continue
+            batch_paths.append(path)
+            rows.append(row)
+
+        yield batch_paths, buffers[idx % 2].batch(), rows, errors
+
+
+def run_batch_inference(model, paths, batch_size=32, num_workers=8):
+    """
+    Score every image path with fixed-size batches.
+
+    Returns:
+        tuple: (results, errors) where results is a list of
+        (path, probabilities) and errors is a list of (path, message)
+    """
+    results, errors = [], []
+
+    with ThreadPoolExecutor(max_workers=num_workers) as executor:
+        for batch_paths, batch, rows, batch_errors in iter_batches(paths, batch_size, executor):
+            errors.extend(batch_errors)
+            if not batch_paths:
+                continue
+
+            probabilities = np.asarray(model.predict_on_batch(batch))
+            results.extend(zip(batch_paths, probabilities[rows]))
+
+    return results, errors
+
+
+def write_results(results, output_path):
+    """Write per-image predictions as CSV or JSON Lines (chosen by file extension)"""
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    rows = []
+    for path, probs in results:
+        idx = int(np.argmax(probs))
+        row = {
+            'path': path,
+            'predicted_class': CLASS_NAMES[idx],
+            'confidence': float(probs[idx]),
+        }
+        row.update({name: float(p) for name, p in zip(CLASS_NAMES, probs)})
+        rows.append(row)
+
+    with open(output_path, 'w', newline='') as f:
+        if output_path.lower().endswith('.jsonl'):
+            for row in rows:
+                f.write(json.dumps(row) + '\n')
+        else:
+            writer = csv.DictWriter(f, fieldnames=['path', 'predicted_class', 'confidence', *CLASS_NAMES])
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Batch dental pathology classification")
+    parser.add_argument('inputs', nargs='+',
+                        help="Image directories, glob patterns, image files or manifests (.txt/.csv)")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path to the trained .keras or .tflite model")
+    parser.add_argument('--mode', default='compiled', choices=INFERENCE_MODES, help="Inference mode")
+    parser.add_argument('--output', default='predictions.csv', help="Results file (.csv or .jsonl)")
+    parser.add_argument('--batch-size', type=int, default=32, help="Images per model call")
+    parser.add_argument('--workers', type=int, default=8, help="Threads used for image decoding")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    paths = collect_image_paths(args.inputs)
+    print(f"Found {len(paths)} images")
+
+    model = load_inference_model(args.model, args.mode)
+
+    start = time.perf_counter()
+    results, errors = run_batch_inference(model, paths, args.batch_size, args.workers)
+    elapsed = time.perf_counter() - start
+
+    write_results(results, args.output)
+
+    print(f"Scored {len(results)} images in {elapsed:.1f}s "
+          f"({len(results) / max(elapsed, 1e-9):.1f} images/sec)")
+    for path, error in errors:
+        print(f"Skipped {path}: {error}")
+    print(f"Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Accuracy versus CPU cost of cascade serving on the labelled test split.
+
+Every test image is scored once by the fast and the full model. For each
+threshold the cascade's accuracy, high-risk recall, escalation rate and
+average per-image latency (fast latency + escalation rate x full latency,
+from measured batch-1 latencies) are then derived without re-running the
+models. The configured threshold is also timed end to end through
+CascadeModel to check the estimate.
+
+Usage:
+    python benchmark_cascade.py "/data/Teeth DataSet/Testing" --fast-model mobilenetv2_transfer_final.keras
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from batch_predict import collect_image_paths, run_batch_inference
+from inference import (
+    CASCADE_THRESHOLD,
+    CLASS_NAMES,
+    FAST_MODEL_PATH,
+    HIGH_RISK_CLASSES,
+    INFERENCE_MODES,
+    MODEL_PATH,
+    BatchPreprocessor,
+    CascadeModel,
+    escalation_mask,
+    load_inference_model,
+)
+
+DEFAULT_THRESHOLDS = (0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99)
+
+
+def labelled_paths(test_dir):
+    """Image paths and label indices from one sub-directory per class"""
+    paths, labels = [], []
+    for label, class_name in enumerate(CLASS_NAMES):
+        class_dir = os.path.join(test_dir, class_name)
+        if not os.path.isdir(class_dir):
+            continue
+        class_paths = collect_image_paths([class_dir])
+        paths.extend(class_paths)
+        labels.extend([label] * len(class_paths))
+    if not paths:
+        raise FileNotFoundError(f"No class directories {CLASS_NAMES} with images in {test_dir}")
+    return paths, np.array(labels)
+
+
+def score(model, paths, batch_size, workers):
+    """Probabilities for every path (in order), failing on unreadable images"""
+    results, errors = run_batch_inference(model, paths, batch_size, workers)
+    if errors:
+        raise RuntimeError(f"Could not decode {len(errors)} images, e.g. {errors[0][0]}: {errors[0][1]}")
+    probabilities = dict(results)
+    return np.stack([probabilities[path] for path in paths])
+
+
+def mean_latency_ms(model, images, warmup=3):
+    """Mean batch-1 latency over the given images"""
+    for i in range(min(warmup, len(images))):
+        model.predict_on_batch(images[i:i + 1])
+    start = time.perf_counter()
+    for i in range(len(images)):
+        model.predict_on_batch(images[i:i + 1])
+    return (time.perf_counter() - start) / len(images) * 1000
+
+
+def quality(predictions, labels, high_risk):
+    """Accuracy plus recall of the high-risk classes"""
+    risky = np.isin(labels, high_risk)
+    return {
+        'accuracy': float((predictions == labels).mean()),
+        'high_risk_recall': float((predictions[risky] == labels[risky]).mean()) if risky.any() else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cascade serving accuracy/latency trade-off")
+    parser.add_argument('test_dir', help="Test split with one sub-directory per class")
+    parser.add_argument('--fast-model', default=FAST_MODEL_PATH, help="Small first-stage model")
+    parser.add_argument('--model', default=MODEL_PATH, help="Full model that escalated images go to")
+    parser.add_argument('--mode', default='compiled', choices=INFERENCE_MODES, help="Inference mode")
+    parser.add_argument('--threshold', type=float, default=CASCADE_THRESHOLD,
+                        help="Threshold timed end to end through CascadeModel")
+    parser.add_argument('--thresholds', type=float, nargs='+', default=DEFAULT_THRESHOLDS,
+                        help="Thresholds to evaluate")
+    parser.add_argument('--escalate-classes', nargs='*', default=list(HIGH_RISK_CLASSES),
+                        help="Classes that always escalate to the full model")
+    parser.add_argument('--latency-samples', type=int, default=100, help="Images used for latency timing")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--output', help="JSON file for the results")
+    args = parser.parse_args()
+
+    paths, labels = labelled_paths(args.test_dir)
+    print(f"Found {len(paths)} labelled test images")
+
+    fast_model = load_inference_model(args.fast_model, args.mode)
+    full_model = load_inference_model(args.model, args.mode)
+    fast_probs = score(fast_model, paths, args.batch_size, args.workers)
+    full_probs = score(full_model, paths, args.batch_size, args.workers)
+
+    # Latency on a sample of real test images, one image per call as in the app
+    sample = np.random.default_rng(0).permutation(len(paths))[:args.latency_samples]
+    preprocessor = BatchPreprocessor(len(sample))
+    for row, index in enumerate(sample):
+        preprocessor.load_file(row, paths[index])
+    images = preprocessor.batch().copy()
+
+    fast_ms = mean_latency_ms(fast_model, images)
+    full_ms = mean_latency_ms(full_model, images)
+    cascade = CascadeModel(fast_model, full_model, args.threshold, args.escalate_classes)
+    cascade_ms = mean_latency_ms(cascade, images, warmup=0)
+
+    high_risk = [CLASS_NAMES.index(name) for name in args.escalate_classes]
+    fast_quality = quality(fast_probs.argmax(axis=1), labels, high_risk)
+    full_quality = quality(full_probs.argmax(axis=1), labels, high_risk)
+    print(f"Fast model: {fast_quality['accuracy']:.2%} accuracy, {fast_ms:.1f} ms/image")
+    print(f"Full model: {full_quality['accuracy']:.2%} accuracy, {full_ms:.1f} ms/image")
+
+    rows = []
+    print(f"{'threshold':>9} | {'accuracy':>8} | {'high-risk recall':>16} | {'escalated':>9} | {'ms/image':>8}")
+    for threshold in sorted(args.thresholds):
+        escalate = escalation_mask(fast_probs, threshold, high_risk)
+        predictions = np.where(escalate, full_probs.argmax(axis=1), fast_probs.argmax(axis=1))
+        rate = float(escalate.mean())
+        row = {
+            'threshold': threshold,
+            **quality(predictions, labels, high_risk),
+            'escalation_rate': rate,
+            'estimated_ms_per_image': fast_ms + rate * full_ms,
+        }
+        rows.append(row)
+        recall = f"{row['high_risk_recall']:.2%}" if row['high_risk_recall'] is not None else 'n/a'
+        print(f"{threshold:>9.2f} | {row['accuracy']:>8.2%} | {recall:>16} | {rate:>9.1%} | "
+              f"{row['estimated_ms_per_image']:>8.1f}")
+
+    print(f"Measured cascade at threshold {args.threshold}: {cascade_ms:.1f} ms/image, "
+          f"{cascade.escalation_rate:.1%} of {cascade.images} sampled images escalated")
+
+    if args.output:
+        results = {
+            'images': len(paths),
+            'mode': args.mode,
+            'escalate_classes': args.escalate_classes,
+            'fast_model': {'path': os.path.basename(args.fast_model), 'ms_per_image': fast_ms, **fast_quality},
+            'full_model': {'path': os.path.basename(args.model), 'ms_per_image': full_ms, **full_quality},
+            'measured_cascade': {
+                'threshold': args.threshold,
+                'ms_per_image': cascade_ms,
+                'escalation_rate': cascade.escalation_rate,
+            },
+            'thresholds': rows,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
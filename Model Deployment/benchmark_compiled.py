@@ -0,0 +1,66 @@
+"""
+Per-image latency of Model.predict versus the compiled serving function.
+
+Usage:
+    python benchmark_compiled.py --model efficientnetb0_transfer_final.keras --iterations 200
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from inference import IMAGE_SIZE, MODEL_PATH, CompiledModel, load_keras_model
+
+
+def time_calls(fn, batch, iterations, warmup=5):
+    """Return per-call latencies in milliseconds"""
+    for _ in range(warmup):
+        fn(batch)
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn(batch)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Model.predict with the compiled inference path")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path to the trained .keras model")
+    parser.add_argument('--iterations', type=int, default=200)
+    parser.add_argument('--skip-xla', action='store_true', help="Do not benchmark the XLA-compiled variant")
+    args = parser.parse_args()
+
+    model = load_keras_model(args.model)
+    image = np.random.randint(0, 256, size=(1, *IMAGE_SIZE, 3)).astype(np.float32)
+
+    paths = {'model.predict': lambda x: model.predict(x, verbose=0)}
+
+    compiled = CompiledModel(model)
+    compiled.warmup()
+    paths['compiled'] = compiled.predict_on_batch
+
+    if not args.skip_xla:
+        xla = CompiledModel(model, jit_compile=True)
+        xla.warmup()
+        paths['compiled + xla'] = xla.predict_on_batch
+
+    # All paths must agree before their speed is worth comparing
+    reference = paths['model.predict'](image)
+    for name, fn in paths.items():
+        np.testing.assert_allclose(fn(image), reference, atol=1e-4, err_msg=name)
+
+    print(f"{'Path':<16} | {'mean ms':>8} | {'p50 ms':>8} | {'p95 ms':>8} | {'speedup':>8}")
+    print("-" * 60)
+    baseline = None
+    for name, fn in paths.items():
+        latencies = time_calls(fn, image, args.iterations)
+        baseline = baseline or latencies.mean()
+        print(f"{name:<16} | {latencies.mean():>8.2f} | {np.percentile(latencies, 50):>8.2f} | "
+              f"{np.percentile(latencies, 95):>8.2f} | {baseline / latencies.mean():>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
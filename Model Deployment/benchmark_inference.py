@@ -0,0 +1,186 @@
+"""
+Inference benchmark for the deployed model, written as JSON for regression tracking.
+
+Reports cold-load time (TensorFlow import + model load, measured in a fresh
+process), first-inference time, p50/p95/p99 latency at batch 1, throughput
+for batch sizes 1..128 and peak RSS.
+
+Usage:
+    python benchmark_inference.py --model efficientnetb0_transfer_final.keras --output bench.json
+    python benchmark_inference.py --reference-model --output bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from inference import IMAGE_SIZE, INFERENCE_MODES, MODEL_PATH
+from prediction_cache import model_version
+
+TRAINING_PIPELINES = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Model Training', 'Pipelines')
+BATCH_SIZES = (1, 2, 4, 8, 16, 32, 64, 128)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process"""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def build_reference_model(path):
+    """Save an untrained model with the production architecture, for machines without the artifact"""
+    sys.path.insert(0, TRAINING_PIPELINES)
+    from transfer_model import create_transfer_learning_model
+
+    model, _ = create_transfer_learning_model(weights=None, verbose=False)
+    model.save(path)
+    return path
+
+
+def cold_start(model_path, mode):
+    """Runs in a fresh interpreter: time the TensorFlow import, model load and first prediction"""
+    start = time.perf_counter()
+    import tensorflow  # noqa: F401
+
+    imported = time.perf_counter()
+    from inference import load_inference_model
+
+    model = load_inference_model(model_path, mode, warmup=False)
+    loaded = time.perf_counter()
+    model.predict(np.zeros((1, *IMAGE_SIZE, 3), dtype=np.float32), verbose=0)
+    first = time.perf_counter()
+
+    return {
+        'import_tensorflow_s': imported - start,
+        'load_model_s': loaded - imported,
+        'cold_load_s': loaded - start,
+        'first_inference_s': first - loaded,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def measure_cold_start(model_path, mode):
+    """Run cold_start() in a child process so nothing is already imported or cached in memory"""
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--cold-start-probe', '--model', model_path, '--mode', mode],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    # TensorFlow may log to stdout; the probe's result is the last line
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def measure_latency(model, iterations, warmup=10):
+    """Batch-1 latency percentiles in milliseconds"""
+    image = np.random.randint(0, 256, size=(1, *IMAGE_SIZE, 3)).astype(np.float32)
+    for _ in range(warmup):
+        model.predict_on_batch(image)
+
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        model.predict_on_batch(image)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies = np.array(latencies)
+
+    return {
+        'iterations': iterations,
+        'mean_ms': float(latencies.mean()),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95)),
+        'p99_ms': float(np.percentile(latencies, 99)),
+    }
+
+
+def measure_throughput(model, batch_sizes, min_images, warmup=2):
+    """Images per second for each batch size, with at least min_images images per measurement"""
+    results = []
+    for batch_size in batch_sizes:
+        batch = np.random.randint(0, 256, size=(batch_size, *IMAGE_SIZE, 3)).astype(np.float32)
+        for _ in range(warmup):
+            model.predict_on_batch(batch)
+
+        calls = max(1, min_images // batch_size)
+        start = time.perf_counter()
+        for _ in range(calls):
+            model.predict_on_batch(batch)
+        elapsed = time.perf_counter() - start
+
+        row = {
+            'batch_size': batch_size,
+            'images_per_sec': calls * batch_size / elapsed,
+            'ms_per_batch': elapsed / calls * 1000,
+        }
+        results.append(row)
+        print(f"batch {batch_size:>3} | {row['images_per_sec']:>8.1f} images/sec | {row['ms_per_batch']:>8.1f} ms/batch")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inference latency and throughput benchmark")
+    parser.add_argument('--model', default=MODEL_PATH, help="Model artifact (.keras, .tflite or SavedModel directory)")
+    parser.add_argument('--reference-model', action='store_true',
+                        help="Benchmark an untrained model with the production architecture instead")
+    parser.add_argument('--mode', default='compiled', choices=INFERENCE_MODES, help="Inference mode")
+    parser.add_argument('--iterations', type=int, default=200, help="Batch-1 latency samples")
+    parser.add_argument('--max-batch-size', type=int, default=128)
+    parser.add_argument('--min-images', type=int, default=256, help="Images per throughput measurement")
+    parser.add_argument('--output', help="JSON file for the results")
+    parser.add_argument('--cold-start-probe', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.cold_start_probe:
+        print(json.dumps(cold_start(args.model, args.mode)))
+        return
+
+    model_path = args.model
+    if args.reference_model:
+        model_path = build_reference_model(os.path.join(tempfile.mkdtemp(), 'reference_model.keras'))
+        print(f"Built reference model: {model_path}")
+
+    print("Measuring cold start in a fresh process...")
+    cold = measure_cold_start(model_path, args.mode)
+    print(f"Cold load {cold['cold_load_s']:.2f}s (TensorFlow import {cold['import_tensorflow_s']:.2f}s), "
+          f"first inference {cold['first_inference_s'] * 1000:.0f} ms")
+
+    from inference import load_inference_model
+
+    model = load_inference_model(model_path, args.mode)
+
+    latency = measure_latency(model, args.iterations)
+    print(f"Batch 1 latency: p50 {latency['p50_ms']:.1f} ms | p95 {latency['p95_ms']:.1f} ms | "
+          f"p99 {latency['p99_ms']:.1f} ms")
+
+    batch_sizes = [b for b in BATCH_SIZES if b <= args.max_batch_size]
+    throughput = measure_throughput(model, batch_sizes, args.min_images)
+
+    results = {
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'model': os.path.basename(model_path),
+        'model_version': 'reference' if args.reference_model else model_version(model_path),
+        'mode': args.mode,
+        'host': {'machine': platform.machine(), 'cpus': os.cpu_count(), 'python': platform.python_version()},
+        'cold_start': cold,
+        'latency_batch_1': latency,
+        'throughput': throughput,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+    print(f"Peak RSS: {results['peak_rss_mb']:.0f} MB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
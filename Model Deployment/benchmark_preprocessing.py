@@ -0,0 +1,101 @@
+"""
+Compare the original single-image preprocessing with the batched engine.
+
+Generates synthetic large JPEGs (4000x3000 by default, the size of typical
+intraoral photos) and times both paths end to end: file open, decode,
+resize and normalisation.
+
+Usage:
+    python benchmark_preprocessing.py --images 64 --width 4000 --height 3000 --batch-size 32
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+from PIL import Image
+
+from inference import BatchPreprocessor
+
+
+def legacy_preprocess_image(image):
+    """The preprocessing the app used before the batched engine (kept for comparison)"""
+    import tensorflow as tf
+
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    original_size = image.size
+    image = image.resize((256, 256))
+    img_array = np.array(image)
+    img_array = np.expand_dims(img_array, axis=0)
+    img_array = tf.keras.applications.efficientnet.preprocess_input(img_array)
+    return img_array, original_size
+
+
+def make_images(directory, count, width, height):
+    """Write `count` photo-like JPEGs (smooth gradients plus noise)"""
+    rng = np.random.default_rng(42)
+    y, x = np.mgrid[0:height, 0:width]
+    paths = []
+    for i in range(count):
+        base = np.stack([(x * (i + 1)) % 256, (y * 2) % 256, ((x + y) // 3) % 256], axis=-1)
+        noise = rng.integers(0, 32, size=(height, width, 3))
+        pixels = np.clip(base + noise, 0, 255).astype(np.uint8)
+        path = os.path.join(directory, f"image_{i:04d}.jpg")
+        Image.fromarray(pixels).save(path, quality=90)
+        paths.append(path)
+    return paths
+
+
+def run_legacy(paths):
+    for path in paths:
+        with Image.open(path) as image:
+            legacy_preprocess_image(image)
+
+
+def run_batched(paths, batch_size):
+    preprocessor = BatchPreprocessor(batch_size)
+    for start in range(0, len(paths), batch_size):
+        chunk = paths[start:start + batch_size]
+        for row, path in enumerate(chunk):
+            preprocessor.load_file(row, path)
+        preprocessor.batch(len(chunk))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Preprocessing benchmark on large images")
+    parser.add_argument('--images', type=int, default=64)
+    parser.add_argument('--width', type=int, default=4000)
+    parser.add_argument('--height', type=int, default=3000)
+    parser.add_argument('--batch-size', type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"Writing {args.images} synthetic {args.width}x{args.height} JPEGs...")
+        paths = make_images(directory, args.images, args.width, args.height)
+
+        # Import TensorFlow and touch the page cache before timing anything
+        run_legacy(paths[:1])
+        run_batched(paths[:1], 1)
+
+        timings = {}
+        start = time.perf_counter()
+        run_legacy(paths)
+        timings['legacy preprocess_image'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        run_batched(paths, args.batch_size)
+        timings['BatchPreprocessor'] = time.perf_counter() - start
+
+    baseline = timings['legacy preprocess_image']
+    print(f"\n{'Path':<25} | {'ms/image':>9} | {'images/sec':>10} | {'speedup':>8}")
+    print("-" * 62)
+    for name, seconds in timings.items():
+        print(f"{name:<25} | {seconds / args.images * 1000:>9.1f} | "
+              f"{args.images / seconds:>10.1f} | {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
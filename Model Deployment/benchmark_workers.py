@@ -0,0 +1,76 @@
+"""
+Scaling benchmark for the multi-process worker pool.
+
+For every worker count from 1 to N, starts a pool, keeps two requests in
+flight per worker from client threads and reports throughput and latency.
+
+Usage:
+    python benchmark_workers.py --max-workers 8 --requests 400 --batch-size 1
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from inference import IMAGE_SIZE, INFERENCE_MODES, MODEL_PATH
+from worker_pool import WorkerPool, available_cpus
+
+
+def measure(pool, num_requests, batch_size, concurrency):
+    """Return throughput and latency percentiles for one pool configuration"""
+    batch = np.random.randint(0, 256, size=(batch_size, *IMAGE_SIZE, 3), dtype=np.uint8)
+
+    def timed_request(_):
+        start = time.perf_counter()
+        pool.predict_on_batch(batch)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = np.array(list(executor.map(timed_request, range(num_requests))))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'images_per_sec': num_requests * batch_size / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Worker pool scaling benchmark")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path to the trained model")
+    parser.add_argument('--mode', default='compiled', choices=INFERENCE_MODES, help="Inference mode")
+    parser.add_argument('--max-workers', type=int, default=min(len(available_cpus()), 8))
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--output', help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    results = []
+    for num_workers in range(1, args.max_workers + 1):
+        pool = WorkerPool(num_workers, args.model, args.mode)
+        try:
+            # Warm every replica before timing
+            measure(pool, num_workers * 2, args.batch_size, num_workers * 2)
+            row = measure(pool, args.requests, args.batch_size, num_workers * 2)
+        finally:
+            pool.close()
+
+        row = {'workers': num_workers, 'cpus_per_worker': len(available_cpus()) // num_workers, **row}
+        results.append(row)
+        print(f"{num_workers:>2} workers | {row['images_per_sec']:>8.1f} images/sec | "
+              f"p50 {row['p50_ms']:>7.1f} ms | p95 {row['p95_ms']:>7.1f} ms | p99 {row['p99_ms']:>7.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,433 @@
+"""
+Streamlit-free inference helpers shared by the web app and the offline tools.
+
+TensorFlow is imported inside the functions that need it: importing it costs
+seconds, and a TFLite deployment never needs it at all.
+"""
+
+import importlib
+import os
+import threading
+import time
+
+import numpy as np
+from PIL import Image
+
+# Reference point for the time-to-first-prediction breakdown
+PROCESS_START = time.perf_counter()
+
+# Class names in the order used by the training pipeline
+CLASS_NAMES = ['CaS', 'CoS', 'Gum', 'MC', 'OC', 'OLP', 'OT']
+
+MODEL_PATH = "efficientnetb0_transfer_final.keras"
+IMAGE_SIZE = (256, 256)
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp', '.tiff')
+
+# 'keras' calls Model.predict, 'compiled' a traced tf.function, 'xla' the same with XLA JIT
+INFERENCE_MODES = ('keras', 'compiled', 'xla')
+
+# Cascade serving: the small model answers first, low-confidence and high-risk results escalate
+FAST_MODEL_PATH = "mobilenetv2_transfer_final.keras"
+CASCADE_THRESHOLD = 0.85
+HIGH_RISK_CLASSES = ('OC',)
+
+
+def strip_augmentation(model):
+    """
+    Return the model without in-graph augmentation.
+
+    Older models embed a RandomFlip/RandomRotation/... Sequential after the
+    input. It is inert at inference time but still part of the serving graph,
+    so it is swapped for an identity; all other layers (and their weights) are
+    reused as they are.
+    """
+    import tensorflow as tf
+
+    random_layers = (
+        tf.keras.layers.RandomFlip, tf.keras.layers.RandomRotation,
+        tf.keras.layers.RandomZoom, tf.keras.layers.RandomTranslation,
+    )
+    augmentation = [
+        layer for layer in model.layers
+        if isinstance(layer, tf.keras.Sequential)
+        and layer.layers and all(isinstance(l, random_layers) for l in layer.layers)
+    ]
+    if not augmentation:
+        return model
+
+    def clone_layer(layer):
+        return tf.keras.layers.Identity() if layer in augmentation else layer
+
+    return tf.keras.models.clone_model(model, clone_function=clone_layer)
+
+
+def load_keras_model(model_path=MODEL_PATH):
+    """Load the trained Keras model from disk, without augmentation layers"""
+    import tensorflow as tf
+
+    return strip_augmentation(tf.keras.models.load_model(model_path))
+
+
+class CompiledModel:
+    """
+    Serving wrapper that calls a traced tf.function instead of Model.predict.
+
+    Model.predict builds a data adapter and predict loop on every call, which
+    dominates latency for single images. The wrapped function has a fixed
+    (None, 256, 256, 3) float32 signature so it is traced exactly once.
+    """
+
+    def __init__(self, model, jit_compile=False):
+        """
+        Args:
+            model (tf.keras.Model): Trained classifier
+            jit_compile (bool): Compile the forward pass with XLA. XLA specialises
+                on concrete shapes, so each new batch size triggers one compile.
+        """
+        import tensorflow as tf
+
+        self._tf = tf
+        self.model = model
+        self.jit_compile = jit_compile
+        self._infer = tf.function(
+            self._forward,
+            input_signature=[tf.TensorSpec(shape=(None, *IMAGE_SIZE, 3), dtype=tf.float32)],
+            jit_compile=jit_compile,
+        )
+
+    def _forward(self, images):
+        return self.model(images, training=False)
+
+    def warmup(self, batch_size=1):
+        """Trace (and compile) the function before the first real request"""
+        self._infer(self._tf.zeros((batch_size, *IMAGE_SIZE, 3), dtype=self._tf.float32))
+
+    def predict_on_batch(self, batch):
+        return self._infer(self._tf.convert_to_tensor(batch, dtype=self._tf.float32)).numpy()
+
+    def predict(self, batch, verbose=0):
+        """Drop-in replacement for Model.predict on in-memory batches"""
+        return self.predict_on_batch(batch)
+
+
+class TFLiteModel:
+    """
+    Runtime for the quantized .tflite exports (dynamic-range, float16 or int8).
+
+    Uses the standalone tflite-runtime interpreter when it is installed and
+    falls back to tf.lite otherwise. Quantized inputs and outputs are
+    converted transparently, so callers always pass float pixel batches.
+    The training pipelines' TFLite evaluation runs through this class too.
+    """
+
+    def __init__(self, model_path, num_threads=None):
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            import tensorflow as tf
+
+            Interpreter = tf.lite.Interpreter
+
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input_shape = None
+        # A TFLite interpreter must not be invoked from two threads at once
+        self._lock = threading.Lock()
+
+    def _set_input_shape(self, shape):
+        if shape == self._input_shape:
+            return
+        input_index = self.interpreter.get_input_details()[0]['index']
+        self.interpreter.resize_tensor_input(input_index, list(shape))
+        self.interpreter.allocate_tensors()
+        self._input_shape = shape
+
+    def predict_on_batch(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+
+        with self._lock:
+            self._set_input_shape(batch.shape)
+            input_details = self.interpreter.get_input_details()[0]
+            output_details = self.interpreter.get_output_details()[0]
+
+            if input_details['dtype'] != np.float32:
+                scale, zero_point = input_details['quantization']
+                info = np.iinfo(input_details['dtype'])
+                batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max)
+                batch = batch.astype(input_details['dtype'])
+
+            self.interpreter.set_tensor(input_details['index'], batch)
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(output_details['index'])
+
+        if output_details['dtype'] != np.float32:
+            scale, zero_point = output_details['quantization']
+            output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+    def predict(self, batch, verbose=0):
+        return self.predict_on_batch(batch)
+
+
+class SavedServingModel:
+    """
+    Loads the serving function exported by export_saved_model.
+
+    Restoring a SavedModel only rebuilds the traced graph and its variables,
+    which is considerably faster than deserialising every Keras layer from the
+    .keras archive.
+    """
+
+    def __init__(self, export_dir):
+        import tensorflow as tf
+
+        self._tf = tf
+        self._module = tf.saved_model.load(export_dir)
+
+    def predict_on_batch(self, batch):
+        images = self._tf.convert_to_tensor(batch, dtype=self._tf.float32)
+        return self._module.serve(images).numpy()
+
+    def predict(self, batch, verbose=0):
+        return self.predict_on_batch(batch)
+
+
+def export_saved_model(model, export_dir):
+    """Save the compiled serving function of a Keras model as a SavedModel directory"""
+    import tensorflow as tf
+
+    compiled = CompiledModel(model)
+    module = tf.Module()
+    module.model = model
+    module.serve = compiled._infer
+    tf.saved_model.save(module, export_dir, signatures={'serving_default': compiled._infer})
+
+
+def load_inference_model(model_path=MODEL_PATH, mode='keras', warmup=True):
+    """
+    Load the model for serving in one of INFERENCE_MODES.
+
+    The mode only applies to .keras files: a .tflite file is served by
+    TFLiteModel and a SavedModel directory by SavedServingModel.
+    """
+    if model_path.endswith('.tflite'):
+        return TFLiteModel(model_path)
+
+    if os.path.isdir(model_path):
+        return SavedServingModel(model_path)
+
+    if mode not in INFERENCE_MODES:
+        raise ValueError(f"Unsupported inference mode: {mode}. Choose from {list(INFERENCE_MODES)}")
+
+    model = load_keras_model(model_path)
+    if mode == 'keras':
+        return model
+
+    compiled = CompiledModel(model, jit_compile=(mode == 'xla'))
+    if warmup:
+        compiled.warmup()
+    return compiled
+
+
+def escalation_mask(probabilities, threshold, escalate_indices):
+    """Rows of fast-model probabilities that need the full model"""
+    top = probabilities.argmax(axis=1)
+    return (probabilities.max(axis=1) < threshold) | np.isin(top, escalate_indices)
+
+
+class CascadeModel:
+    """
+    Two-stage classifier: a cheap model answers first and hard cases go to the full model.
+
+    An image escalates when the fast model's top-1 probability is below
+    `threshold` or its predicted class is in `escalate_classes`, so a
+    high-risk finding is always confirmed by the full model. Only the
+    escalated rows of a batch are passed to the full model.
+    """
+
+    def __init__(self, fast_model, full_model, threshold=CASCADE_THRESHOLD, escalate_classes=HIGH_RISK_CLASSES):
+        self.fast_model = fast_model
+        self.full_model = full_model
+        self.threshold = threshold
+        self.escalate_indices = [CLASS_NAMES.index(name) for name in escalate_classes]
+        self.images = 0
+        self.escalations = 0
+        self._lock = threading.Lock()
+
+    def predict_on_batch(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        probabilities = np.array(self.fast_model.predict_on_batch(batch), dtype=np.float32)
+        escalate = escalation_mask(probabilities, self.threshold, self.escalate_indices)
+        if escalate.any():
+            probabilities[escalate] = self.full_model.predict_on_batch(batch[escalate])
+
+        with self._lock:
+            self.images += len(batch)
+            self.escalations += int(escalate.sum())
+        return probabilities
+
+    def predict(self, batch, verbose=0):
+        return self.predict_on_batch(batch)
+
+    @property
+    def escalation_rate(self):
+        return self.escalations / self.images if self.images else 0.0
+
+
+def load_cascade_model(fast_model_path=FAST_MODEL_PATH, full_model_path=MODEL_PATH, mode='keras',
+                       threshold=CASCADE_THRESHOLD, escalate_classes=HIGH_RISK_CLASSES, warmup=True):
+    """Load both stages of a CascadeModel in the same inference mode"""
+    return CascadeModel(
+        load_inference_model(fast_model_path, mode, warmup),
+        load_inference_model(full_model_path, mode, warmup),
+        threshold,
+        escalate_classes,
+    )
+
+
+class BackgroundModelLoader:
+    """
+    Load and warm up the model on a background thread.
+
+    The caller can render its UI immediately and only block in result() when
+    the model is actually needed. Each startup stage is recorded in `timings`
+    (seconds), including the time from process start to the first prediction.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, mode='keras', fast_model_path=None, cascade_threshold=CASCADE_THRESHOLD):
+        """
+        Args:
+            model_path (str): Model artifact (.keras, .tflite or SavedModel directory)
+            mode (str): One of INFERENCE_MODES
+            fast_model_path (str): If set, serve a CascadeModel with this model as the fast stage
+            cascade_threshold (float): Confidence below which the cascade escalates
+        """
+        self.model_path = model_path
+        self.mode = mode
+        self.fast_model_path = fast_model_path
+        self.cascade_threshold = cascade_threshold
+        self.timings = {}
+        self._model = None
+        self._error = None
+        self._thread = threading.Thread(target=self._load, name='model-loader', daemon=True)
+        self._thread.start()
+
+    def _timed(self, stage, fn):
+        start = time.perf_counter()
+        result = fn()
+        self.timings[stage] = time.perf_counter() - start
+        return result
+
+    def _load(self):
+        try:
+            if not self.model_path.endswith('.tflite'):
+                self._timed('import_tensorflow', lambda: importlib.import_module('tensorflow'))
+
+            model = self._timed(
+                'load_model', lambda: load_inference_model(self.model_path, self.mode, warmup=False)
+            )
+            dummy = np.zeros((1, *IMAGE_SIZE, 3), dtype=np.float32)
+            self._timed('warmup_inference', lambda: model.predict(dummy, verbose=0))
+
+            if self.fast_model_path:
+                fast_model = self._timed(
+                    'load_fast_model', lambda: load_inference_model(self.fast_model_path, self.mode, warmup=False)
+                )
+                self._timed('warmup_fast_inference', lambda: fast_model.predict(dummy, verbose=0))
+                model = CascadeModel(fast_model, model, self.cascade_threshold)
+
+            self.timings['model_ready'] = time.perf_counter() - PROCESS_START
+            self._model = model
+        except Exception as e:
+            self._error = e
+
+    @property
+    def ready(self):
+        return not self._thread.is_alive()
+
+    def result(self, timeout=None):
+        """Block until the model is ready and return it (re-raises loading errors)"""
+        self._thread.join(timeout)
+        if self._error is not None:
+            raise self._error
+        return self._model
+
+    def record_prediction(self):
+        """Record time-to-first-prediction the first time it is called"""
+        if 'first_prediction' not in self.timings:
+            self.timings['first_prediction'] = time.perf_counter() - PROCESS_START
+
+
+def image_to_array(image, out=None):
+    """
+    Convert a PIL image to a resized uint8 RGB array of shape (256, 256, 3).
+
+    JPEGs are decoded at reduced scale with draft() and other formats are
+    pre-shrunk by resize's reducing_gap, so large intraoral photos are never
+    fully decoded and resampled at 12+ MP. If `out` is given, the pixels are
+    written into it (e.g. one row of a preallocated batch buffer).
+    """
+    # DCT-domain downscaling; only effective before the image data is loaded
+    if image.format == 'JPEG':
+        image.draft('RGB', IMAGE_SIZE)
+
+    # Convert to RGB if needed
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    # Resize to model input size (256x256)
+    image = image.resize(IMAGE_SIZE, reducing_gap=3.0)
+
+    if out is None:
+        return np.asarray(image, dtype=np.uint8)
+    out[...] = np.asarray(image)
+    return out
+
+
+def preprocess_batch(batch):
+    """Apply EfficientNet preprocessing to a stacked (N, 256, 256, 3) batch"""
+    # EfficientNet rescales inside the model, so keras' efficientnet.preprocess_input
+    # is a pass-through; skipping it keeps TensorFlow out of the preprocessing path.
+    return batch
+
+
+class BatchPreprocessor:
+    """
+    Decode images straight into a preallocated (batch_size, 256, 256, 3) buffer.
+
+    Rows are filled independently (safe from several threads as long as each
+    thread writes its own row) and the whole batch is cast to float32 in one
+    step. batch() returns views into reused buffers, valid until the next fill.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self._pixels = np.zeros((batch_size, *IMAGE_SIZE, 3), dtype=np.uint8)
+        self._floats = np.empty((batch_size, *IMAGE_SIZE, 3), dtype=np.float32)
+
+    def load(self, index, image):
+        """Resize a PIL image into row `index`"""
+        image_to_array(image, out=self._pixels[index])
+
+    def load_file(self, index, path):
+        """Decode an image file into row `index`"""
+        with Image.open(path) as image:
+            self.load(index, image)
+
+    def batch(self, count=None):
+        """Return the first `count` rows as a model-ready float32 batch"""
+        count = self.batch_size if count is None else count
+        np.copyto(self._floats[:count], self._pixels[:count], casting='unsafe')
+        return preprocess_batch(self._floats[:count])
+
+
+def preprocess_image(image):
+    """Preprocess image for EfficientNetB0 model"""
+    # Store original size for display
+    original_size = image.size
+
+    # Decode straight into a single-image batch
+    preprocessor = BatchPreprocessor(1)
+    preprocessor.load(0, image)
+
+    return preprocessor.batch(), original_size
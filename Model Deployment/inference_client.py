@@ -0,0 +1,93 @@
+"""
+Client for the local micro-batching inference server.
+
+The client mirrors ``tf.keras.Model.predict`` so the Streamlit app can use it
+in place of an in-process model. Running this module directly fires
+concurrent requests at a server and reports requests/sec and latency.
+
+Usage:
+    python inference_client.py --url http://127.0.0.1:8600 --concurrency 16 --requests 500
+"""
+
+import argparse
+import json
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+TENSOR_CONTENT_TYPE = 'application/octet-stream'
+
+
+class InferenceClient:
+    """HTTP client for inference_server.py with a Keras-like predict()."""
+
+    def __init__(self, url, timeout=30.0):
+        self.url = url.rstrip('/')
+        self.timeout = timeout
+
+    def health(self):
+        """Return the server status payload (raises if the server is unreachable)"""
+        with urllib.request.urlopen(f"{self.url}/health", timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def predict_one(self, image_array):
+        """Send one (256, 256, 3) image and return its probability vector"""
+        body = np.ascontiguousarray(image_array, dtype=np.uint8).tobytes()
+        request = urllib.request.Request(
+            f"{self.url}/predict",
+            data=body,
+            headers={'Content-Type': TENSOR_CONTENT_TYPE},
+            method='POST',
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            payload = json.loads(response.read())
+        return np.asarray(payload['probabilities'], dtype=np.float32)
+
+    def predict(self, batch, verbose=0):
+        """Predict a (N, 256, 256, 3) batch; images are batched server-side"""
+        return np.stack([self.predict_one(image) for image in batch])
+
+
+def run_load_test(client, num_requests, concurrency):
+    """Send random images from `concurrency` threads and return latency statistics"""
+    image = np.random.randint(0, 256, size=(256, 256, 3), dtype=np.uint8)
+
+    def timed_request(_):
+        start = time.perf_counter()
+        client.predict_one(image)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = np.array(list(executor.map(timed_request, range(num_requests))))
+    elapsed = time.perf_counter() - start
+
+    return {
+        'requests': num_requests,
+        'concurrency': concurrency,
+        'requests_per_sec': num_requests / elapsed,
+        'p50_ms': float(np.percentile(latencies, 50) * 1000),
+        'p95_ms': float(np.percentile(latencies, 95) * 1000),
+        'p99_ms': float(np.percentile(latencies, 99) * 1000),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test for the inference server")
+    parser.add_argument('--url', default='http://127.0.0.1:8600')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    args = parser.parse_args()
+
+    client = InferenceClient(args.url)
+    client.health()
+
+    results = run_load_test(client, args.requests, args.concurrency)
+    print(json.dumps(results, indent=2))
+    print(f"Server stats: {json.dumps(client.health())}")
+
+
+if __name__ == "__main__":
+    main()
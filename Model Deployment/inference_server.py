@@ -0,0 +1,262 @@
+"""
+Local inference server with dynamic micro-batching.
+
+A single process holds the model and gathers concurrent requests into
+micro-batches: a batch is dispatched as soon as it reaches ``max_batch_size``
+or ``max_wait_ms`` after its first request arrived, whichever comes first.
+
+Usage:
+    python inference_server.py --port 8600 --max-batch-size 16 --max-wait-ms 5
+
+Endpoints:
+    POST /predict   body: raw uint8 RGB tensor (256x256x3, application/octet-stream)
+                    or an encoded image file (image/*)
+    GET  /health    server status, model version and batching statistics
+"""
+
+import argparse
+import io
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+from PIL import Image
+
+from inference import (
+    CLASS_NAMES,
+    IMAGE_SIZE,
+    INFERENCE_MODES,
+    MODEL_PATH,
+    image_to_array,
+    load_inference_model,
+    preprocess_batch,
+)
+from inference_client import TENSOR_CONTENT_TYPE
+from prediction_cache import model_version
+from worker_pool import WorkerPool
+
+TENSOR_SHAPE = (*IMAGE_SIZE, 3)
+
+
+class MicroBatcher:
+    """Collect single-image requests from many threads and run them as batches."""
+
+    def __init__(self, predict_fn, max_batch_size=16, max_wait_ms=5.0, num_dispatchers=1):
+        """
+        Args:
+            predict_fn (callable): Maps a (N, 256, 256, 3) batch to (N, num_classes) probabilities
+            max_batch_size (int): Upper bound on images per model call
+            max_wait_ms (float): Longest time the first request of a batch waits for company
+            num_dispatchers (int): Batches in flight at once; more than one only helps
+                when predict_fn fans out to several replicas (see worker_pool.py)
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'batches': 0}
+        self._threads = [
+            threading.Thread(target=self._run, name=f'micro-batcher-{i}', daemon=True)
+            for i in range(num_dispatchers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, image_array):
+        """Queue one (256, 256, 3) image and return a Future with its probability vector"""
+        future = Future()
+        self._queue.put((image_array, future))
+        return future
+
+    def close(self):
+        """Stop the batching threads after pending requests are served"""
+        # One sentinel stops every dispatcher: each re-queues it before exiting
+        self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    @property
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['mean_batch_size'] = stats['requests'] / stats['batches'] if stats['batches'] else 0.0
+        return stats
+
+    def _collect(self, first):
+        """Gather requests until the batch is full or the wait budget is spent"""
+        items = [first]
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+
+        while len(items) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Re-queue the sentinel so the main loop exits after this batch
+                self._queue.put(None)
+                break
+            items.append(item)
+
+        return items
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                self._queue.put(None)
+                return
+
+            items = self._collect(first)
+            batch = np.stack([array for array, _ in items])
+
+            try:
+                probabilities = np.asarray(self.predict_fn(batch))
+            except Exception as e:
+                for _, future in items:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), probs in zip(items, probabilities):
+                future.set_result(probs)
+
+            with self._lock:
+                self._stats['requests'] += len(items)
+                self._stats['batches'] += 1
+
+
+def decode_request_body(body, content_type):
+    """Turn a request body into a (256, 256, 3) uint8 array"""
+    if content_type.startswith(TENSOR_CONTENT_TYPE):
+        array = np.frombuffer(body, dtype=np.uint8)
+        if array.size != np.prod(TENSOR_SHAPE):
+            raise ValueError(f"Expected {np.prod(TENSOR_SHAPE)} bytes for a raw tensor, got {array.size}")
+        return array.reshape(TENSOR_SHAPE)
+
+    with Image.open(io.BytesIO(body)) as image:
+        return image_to_array(image)
+
+
+def make_handler(batcher, request_timeout, model_version=None):
+    """Build a request handler class bound to a MicroBatcher"""
+
+    class InferenceRequestHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path != '/health':
+                self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+                return
+            self._send_json(200, {'status': 'ok', 'classes': CLASS_NAMES, 'model_version': model_version,
+                                  **batcher.stats})
+
+        def do_POST(self):
+            if self.path != '/predict':
+                self._send_json(404, {'error': f"Unknown endpoint: {self.path}"})
+                return
+
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                body = self.rfile.read(length)
+                image_array = decode_request_body(body, self.headers.get('Content-Type', ''))
+            except Exception as e:
+                self._send_json(400, {'error': str(e)})
+                return
+
+            try:
+                probabilities = batcher.submit(image_array).result(timeout=request_timeout)
+            except Exception as e:
+                self._send_json(500, {'error': str(e)})
+                return
+
+            self._send_json(200, {'probabilities': [float(p) for p in probabilities]})
+
+        def log_message(self, format, *args):
+            # Per-request access logs are too noisy under load
+            pass
+
+    return InferenceRequestHandler
+
+
+def create_server(model, host='127.0.0.1', port=8600, max_batch_size=16, max_wait_ms=5.0,
+                  request_timeout=30.0, num_dispatchers=1, model_version=None):
+    """
+    Create a threaded HTTP server that serves the model through a MicroBatcher.
+
+    model_version is reported by /health so clients can key cached results on it.
+
+    Returns:
+        tuple: (server, batcher)
+    """
+    def predict_fn(batch):
+        return model.predict_on_batch(preprocess_batch(batch))
+
+    batcher = MicroBatcher(predict_fn, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                           num_dispatchers=num_dispatchers)
+    server = ThreadingHTTPServer((host, port), make_handler(batcher, request_timeout, model_version))
+    server.daemon_threads = True
+    return server, batcher
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Micro-batching inference server")
+    parser.add_argument('--model', default=MODEL_PATH, help="Path to the trained .keras or .tflite model")
+    parser.add_argument('--mode', default='compiled', choices=INFERENCE_MODES, help="Inference mode")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8600)
+    parser.add_argument('--max-batch-size', type=int, default=16, help="Maximum images per model call")
+    parser.add_argument('--max-wait-ms', type=float, default=5.0,
+                        help="Maximum time a request waits for a batch to fill")
+    parser.add_argument('--processes', type=int, default=0,
+                        help="Serve from this many pinned model replicas (0 = in-process model)")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    if args.processes:
+        model = WorkerPool(args.processes, args.model, args.mode)
+    else:
+        model = load_inference_model(args.model, args.mode)
+
+    # With a worker pool, keep one batch in flight per replica
+    server, batcher = create_server(model, args.host, args.port, args.max_batch_size, args.max_wait_ms,
+                                    num_dispatchers=max(args.processes, 1),
+                                    model_version=model_version(args.model))
+
+    # Trace the predict function once before accepting traffic
+    batcher.submit(np.zeros(TENSOR_SHAPE, dtype=np.uint8)).result()
+
+    print(f"Serving {args.model} on http://{args.host}:{args.port} "
+          f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        batcher.close()
+        if args.processes:
+            model.close()
+
+
+if __name__ == "__main__":
+    main()
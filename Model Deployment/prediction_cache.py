@@ -0,0 +1,130 @@
+"""
+Content-addressed cache of prediction results.
+
+Entries are keyed by a hash of the uploaded bytes plus the model version, so
+a rerun or a repeated upload of the same image skips both decoding and
+inference. The in-process store is an LRU with a fixed number of entries;
+an optional directory store lets several app workers share results.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def model_version(model_path):
+    """Identify a model artifact by name, size and modification time"""
+    # SavedModel exports are directories; their graph file changes on every export
+    stat_path = os.path.join(model_path, 'saved_model.pb') if os.path.isdir(model_path) else model_path
+    try:
+        stat = os.stat(stat_path)
+    except OSError:
+        return os.path.basename(model_path)
+    return f"{os.path.basename(model_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class PredictionCache:
+    """Thread-safe LRU cache of JSON-serialisable prediction results."""
+
+    def __init__(self, version, max_entries=256, disk_dir=None, max_disk_entries=10000, trim_interval=100):
+        """
+        Args:
+            version (str): Model version mixed into every key
+            max_entries (int): Entries kept in memory before the least recently used is evicted
+            disk_dir (str): Optional directory shared between workers
+            max_disk_entries (int): Entries kept on disk before the oldest are removed
+            trim_interval (int): Disk writes between scans for entries over the limit
+        """
+        self.version = version
+        self.max_entries = max_entries
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.trim_interval = trim_interval
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._disk_writes = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def make_key(self, data):
+        """Hash raw image bytes together with the model version"""
+        digest = hashlib.sha256(self.version.encode('utf-8'))
+        digest.update(data)
+        return digest.hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """Return the cached result for key, or None"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key)) as f:
+                    value = json.load(f)
+            except (OSError, ValueError):
+                value = None
+            if value is not None:
+                self._remember(key, value)
+                with self._lock:
+                    self.hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Store a result in memory and, if configured, on disk"""
+        self._remember(key, value)
+
+        if self.disk_dir:
+            # Write-then-rename so concurrent readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, self._disk_path(key))
+
+            # Scanning the directory is O(entries), so only do it every trim_interval writes;
+            # the store may exceed max_disk_entries by that many entries in between
+            with self._lock:
+                self._disk_writes += 1
+                trim = self._disk_writes % self.trim_interval == 0
+            if trim:
+                self._trim_disk()
+
+    def _trim_disk(self):
+        entries = [e for e in os.scandir(self.disk_dir) if e.name.endswith('.json')]
+        if len(entries) <= self.max_disk_entries:
+            return
+
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                # Another worker removed it first
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,140 @@
+"""
+Prediction history for the app: a bounded in-session buffer with running aggregates,
+plus an optional SQLite store for querying and exporting predictions across sessions.
+
+Usage:
+    store = HistoryStore('predictions.db')
+    history = PredictionHistory(capacity=500, store=store)
+    history.add('OC', 0.93)
+    history.mean_confidence, history.most_common(), history.recent(10)
+    store.export_csv('oc.csv', predicted_class='OC', since='2025-01-01')
+"""
+
+import csv
+import io
+import sqlite3
+import threading
+import uuid
+from collections import Counter, deque
+from datetime import datetime
+
+
+class PredictionHistory:
+    """Ring buffer of recent predictions with O(1) count, mean confidence and per-class counters."""
+
+    def __init__(self, capacity=500, store=None):
+        self.capacity = capacity
+        self.store = store
+        self.session_id = uuid.uuid4().hex
+        self.clear()
+
+    def clear(self):
+        """Reset this session's history (the persistent store keeps its records)"""
+        self.entries = deque(maxlen=self.capacity)
+        self.count = 0
+        self.confidence_sum = 0.0
+        self.class_counts = Counter()
+
+    def add(self, predicted_class, confidence, timestamp=None):
+        """Record a prediction; the oldest entry is dropped once the buffer is full"""
+        timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.count += 1
+        self.confidence_sum += confidence
+        self.class_counts[predicted_class] += 1
+        entry = {'number': self.count, 'class': predicted_class, 'confidence': confidence, 'timestamp': timestamp}
+        self.entries.append(entry)
+
+        if self.store is not None:
+            self.store.add(predicted_class, confidence, timestamp, self.session_id)
+        return entry
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def mean_confidence(self):
+        return self.confidence_sum / self.count if self.count else 0.0
+
+    def most_common(self):
+        """Most frequently predicted class this session, or None"""
+        top = self.class_counts.most_common(1)
+        return top[0][0] if top else None
+
+    def recent(self, n=10):
+        """The n newest entries, newest first"""
+        return [self.entries[-i] for i in range(1, min(n, len(self.entries)) + 1)]
+
+
+class HistoryStore:
+    """SQLite record of all predictions, indexed by timestamp and class."""
+
+    COLUMNS = ('timestamp', 'class', 'confidence', 'session_id')
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # One connection shared by Streamlit's script threads, serialised by the lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS predictions ('
+                'id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, class TEXT NOT NULL, '
+                'confidence REAL NOT NULL, session_id TEXT)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_predictions_timestamp ON predictions (timestamp)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_predictions_class ON predictions (class, timestamp)')
+
+    def add(self, predicted_class, confidence, timestamp, session_id=None):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT INTO predictions (timestamp, class, confidence, session_id) VALUES (?, ?, ?, ?)',
+                (timestamp, predicted_class, float(confidence), session_id),
+            )
+
+    @staticmethod
+    def _where(since=None, until=None, predicted_class=None):
+        clauses, params = [], []
+        if since is not None:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('timestamp < ?')
+            params.append(until)
+        if predicted_class is not None:
+            clauses.append('class = ?')
+            params.append(predicted_class)
+        return (' WHERE ' + ' AND '.join(clauses) if clauses else ''), params
+
+    def query(self, since=None, until=None, predicted_class=None, limit=None):
+        """Predictions in a time range and/or of one class, newest first"""
+        where, params = self._where(since, until, predicted_class)
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM predictions{where} ORDER BY timestamp DESC, id DESC"
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    def class_counts(self, since=None, until=None):
+        """Number of predictions and mean confidence per class"""
+        where, params = self._where(since, until)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT class, COUNT(*), AVG(confidence) FROM predictions{where} GROUP BY class", params
+            ).fetchall()
+        return {name: {'count': count, 'mean_confidence': mean} for name, count, mean in rows}
+
+    def to_csv(self, since=None, until=None, predicted_class=None):
+        """Matching predictions as CSV text"""
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=self.COLUMNS)
+        writer.writeheader()
+        writer.writerows(self.query(since, until, predicted_class))
+        return buffer.getvalue()
+
+    def export_csv(self, path, since=None, until=None, predicted_class=None):
+        """Write matching predictions to a CSV file"""
+        with open(path, 'w', newline='') as f:
+            f.write(self.to_csv(since, until, predicted_class))
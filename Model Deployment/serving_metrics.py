@@ -0,0 +1,177 @@
+"""
+Per-stage timing of the serving hot path, exported in the Prometheus text format.
+
+Each request is a RequestTrace whose stages (image decode, preprocessing,
+inference, rendering, ...) are timed with a context manager. Finished traces
+feed counters and per-stage latency histograms that can be scraped from a
+local /metrics endpoint or read from a textfile, and can optionally be
+appended to a JSON-lines trace log for finding individual slow requests.
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{value}"' for key, value in labels) + '}'
+
+
+class MetricsRegistry:
+    """Thread-safe counters and per-stage latency histograms."""
+
+    def __init__(self, namespace='dental', buckets=DEFAULT_BUCKETS):
+        self.namespace = namespace
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        """Add value to a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, stage, seconds):
+        """Record one duration in the stage's histogram"""
+        with self._lock:
+            histogram = self._histograms.setdefault(stage, {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0})
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += seconds
+            histogram['count'] += 1
+
+    def render(self):
+        """Prometheus text exposition of every metric"""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {stage: {**h, 'buckets': list(h['buckets'])} for stage, h in self._histograms.items()}
+
+        lines = []
+        for name in sorted({name for name, _ in counters}):
+            metric = f"{self.namespace}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for (counter_name, labels), value in sorted(counters.items()):
+                if counter_name == name:
+                    lines.append(f"{metric}{_format_labels(labels)} {value}")
+
+        metric = f"{self.namespace}_stage_seconds"
+        if histograms:
+            lines.append(f"# TYPE {metric} histogram")
+        for stage, histogram in sorted(histograms.items()):
+            for bound, count in zip(self.buckets, histogram['buckets']):
+                lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{metric}_bucket{{stage="{stage}",le="+Inf"}} {histogram["count"]}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {histogram["sum"]:.6f}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {histogram["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+class RequestTrace:
+    """Stage timings of a single request"""
+
+    def __init__(self, **attributes):
+        self.attributes = attributes
+        self.stages = {}
+        self.start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block; repeated stages of the same name add up"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+
+class ServingMetrics:
+    """Registry plus its exporters: HTTP endpoint, textfile and trace log."""
+
+    def __init__(self, port=None, metrics_file=None, trace_log=None, host='127.0.0.1'):
+        """
+        Args:
+            port (int): Serve GET /metrics on this port (None = no endpoint)
+            metrics_file (str): Rewrite this file after every request, for textfile scrapers
+            trace_log (str): Append one JSON line per request to this file
+            host (str): Interface for the metrics endpoint
+        """
+        self.registry = MetricsRegistry()
+        self.metrics_file = metrics_file
+        self.trace_log = trace_log
+        self._trace_lock = threading.Lock()
+        self.server = start_metrics_server(self.registry, port, host) if port else None
+
+    def start_request(self, **attributes):
+        return RequestTrace(**attributes)
+
+    def finish_request(self, trace, outcome):
+        """Record a finished request's stages, its total time and its outcome"""
+        total = trace.elapsed
+        for stage, seconds in trace.stages.items():
+            self.registry.observe(stage, seconds)
+        self.registry.observe('total', total)
+        self.registry.inc('requests', outcome=outcome)
+
+        if self.trace_log:
+            record = {
+                'time': datetime.now(timezone.utc).isoformat(),
+                'outcome': outcome,
+                'total_ms': round(total * 1000, 3),
+                'stages_ms': {stage: round(seconds * 1000, 3) for stage, seconds in trace.stages.items()},
+                **trace.attributes,
+            }
+            with self._trace_lock, open(self.trace_log, 'a') as f:
+                f.write(json.dumps(record) + '\n')
+
+        if self.metrics_file:
+            write_metrics_file(self.registry, self.metrics_file)
+
+
+def write_metrics_file(registry, path):
+    """Write the metrics atomically, so a scraper never reads a partial file"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def start_metrics_server(registry, port, host='127.0.0.1'):
+    """Serve GET /metrics from a daemon thread"""
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Scrapes every few seconds would flood the app's log
+            pass
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+    return server
@@ -0,0 +1,222 @@
+"""
+Multi-process CPU inference with one model replica per worker.
+
+Batch-1 EfficientNetB0 does not saturate TensorFlow's intra-op thread pool on
+many-core nodes, so instead of one large replica the pool runs N smaller ones,
+each pinned to its own slice of cores with its own thread settings. Requests
+go to the worker with the fewest requests in flight.
+"""
+
+import itertools
+import multiprocessing as mp
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+from inference import IMAGE_SIZE, MODEL_PATH
+
+# How often blocked waits check that the worker processes are still alive
+LIVENESS_INTERVAL_S = 1.0
+
+
+def available_cpus():
+    """CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def partition_cpus(num_workers, cpus=None):
+    """Split the available CPUs into `num_workers` contiguous, near-equal slices"""
+    cpus = available_cpus() if cpus is None else cpus
+    if num_workers > len(cpus):
+        raise ValueError(f"Cannot pin {num_workers} workers to {len(cpus)} CPUs")
+    return [list(chunk) for chunk in np.array_split(cpus, num_workers)]
+
+
+def _worker_main(worker_id, model_path, mode, cpus, intra_op_threads, inter_op_threads,
+                 request_queue, response_queue):
+    """Worker process: pin, configure TensorFlow threading, then serve batches until None arrives"""
+    try:
+        if cpus and hasattr(os, 'sched_setaffinity'):
+            os.sched_setaffinity(0, cpus)
+
+        # Thread pools must be configured before TensorFlow executes its first op
+        import tensorflow as tf
+
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op_threads)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op_threads)
+
+        from inference import load_inference_model
+
+        model = load_inference_model(model_path, mode)
+        model.predict(np.zeros((1, *IMAGE_SIZE, 3), dtype=np.float32), verbose=0)
+    except Exception as e:
+        response_queue.put(('failed', worker_id, repr(e)))
+        return
+    response_queue.put(('ready', worker_id, None))
+
+    while True:
+        item = request_queue.get()
+        if item is None:
+            return
+        request_id, batch = item
+        try:
+            result = np.asarray(model.predict(batch.astype(np.float32), verbose=0))
+            response_queue.put((request_id, worker_id, result))
+        except Exception as e:
+            response_queue.put((request_id, worker_id, RuntimeError(repr(e))))
+
+
+class WorkerPool:
+    """Pool of model replicas in separate processes with least-loaded routing."""
+
+    def __init__(self, num_workers, model_path=MODEL_PATH, mode='compiled', intra_op_threads=None,
+                 inter_op_threads=1, pin_cpus=True, ready_timeout=600, request_timeout=120):
+        """
+        Args:
+            num_workers (int): Number of model replicas (processes)
+            model_path (str): Model artifact loaded by every worker
+            mode (str): Inference mode, see inference.INFERENCE_MODES
+            intra_op_threads (int): Threads per op in each worker; defaults to its CPU slice size
+            inter_op_threads (int): Ops run concurrently in each worker
+            pin_cpus (bool): Pin each worker to its own slice of CPUs
+            ready_timeout (float): Seconds to wait for all workers to load the model
+            request_timeout (float): Seconds predict_on_batch waits for a result
+        """
+        self.num_workers = num_workers
+        self.request_timeout = request_timeout
+        cpu_slices = partition_cpus(num_workers)
+
+        # TensorFlow is not fork-safe, so workers always start from a fresh interpreter
+        context = mp.get_context('spawn')
+        self._response_queue = context.Queue()
+        self._request_queues = []
+        self._processes = []
+        for worker_id, cpus in enumerate(cpu_slices):
+            request_queue = context.Queue()
+            process = context.Process(
+                target=_worker_main,
+                args=(worker_id, model_path, mode, cpus if pin_cpus else None,
+                      intra_op_threads or len(cpus), inter_op_threads,
+                      request_queue, self._response_queue),
+                daemon=True,
+            )
+            process.start()
+            self._request_queues.append(request_queue)
+            self._processes.append(process)
+
+        self._wait_until_ready(ready_timeout)
+
+        self._lock = threading.Lock()
+        self._in_flight = [0] * num_workers
+        self._alive = [True] * num_workers
+        self._futures = {}
+        self._request_ids = itertools.count()
+        self._collector = threading.Thread(target=self._collect_responses, name='pool-collector', daemon=True)
+        self._collector.start()
+
+    def _wait_until_ready(self, timeout):
+        """Wait for every worker's 'ready', failing fast if one reports an error or dies"""
+        deadline = time.monotonic() + timeout
+        pending = set(range(self.num_workers))
+        while pending:
+            try:
+                status, worker_id, error = self._response_queue.get(timeout=LIVENESS_INTERVAL_S)
+            except queue.Empty:
+                dead = [w for w in pending if not self._processes[w].is_alive()]
+                if dead:
+                    self.close()
+                    raise RuntimeError(f"Worker {dead[0]} exited while loading the model "
+                                       f"(exit code {self._processes[dead[0]].exitcode})")
+                if time.monotonic() > deadline:
+                    self.close()
+                    raise TimeoutError(f"Workers {sorted(pending)} not ready after {timeout}s")
+                continue
+            if status == 'failed':
+                self.close()
+                raise RuntimeError(f"Worker {worker_id} failed to load the model: {error}")
+            pending.discard(worker_id)
+
+    def _check_workers(self):
+        """Fail the pending requests of workers that have exited and stop routing to them"""
+        for worker_id, process in enumerate(self._processes):
+            if not self._alive[worker_id] or process.is_alive():
+                continue
+            error = RuntimeError(f"Worker {worker_id} exited (exit code {process.exitcode})")
+            with self._lock:
+                self._alive[worker_id] = False
+                self._in_flight[worker_id] = 0
+                lost = [rid for rid, (_, w) in self._futures.items() if w == worker_id]
+                futures = [self._futures.pop(rid)[0] for rid in lost]
+            for future in futures:
+                future.set_exception(error)
+
+    def _collect_responses(self):
+        last_check = time.monotonic()
+        while True:
+            try:
+                item = self._response_queue.get(timeout=LIVENESS_INTERVAL_S)
+            except queue.Empty:
+                item = ()
+            if item is None:
+                return
+
+            if item:
+                request_id, worker_id, result = item
+                with self._lock:
+                    # Already failed by _check_workers if its worker has since exited
+                    entry = self._futures.pop(request_id, None)
+                    if entry is not None:
+                        self._in_flight[worker_id] -= 1
+                if entry is None:
+                    pass
+                elif isinstance(result, Exception):
+                    entry[0].set_exception(result)
+                else:
+                    entry[0].set_result(result)
+
+            if time.monotonic() - last_check >= LIVENESS_INTERVAL_S:
+                self._check_workers()
+                last_check = time.monotonic()
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return list(self._in_flight)
+
+    def submit(self, batch):
+        """Send a (N, 256, 256, 3) batch to the least-loaded worker and return a Future"""
+        # Pixel values are whole numbers, so uint8 transfer is lossless and 4x smaller
+        batch = np.ascontiguousarray(batch, dtype=np.uint8)
+        future = Future()
+        with self._lock:
+            workers = [w for w in range(self.num_workers) if self._alive[w]]
+            if not workers:
+                raise RuntimeError("All inference workers have exited")
+            worker_id = min(workers, key=self._in_flight.__getitem__)
+            self._in_flight[worker_id] += 1
+            request_id = next(self._request_ids)
+            self._futures[request_id] = (future, worker_id)
+        self._request_queues[worker_id].put((request_id, batch))
+        return future
+
+    def predict_on_batch(self, batch):
+        return self.submit(batch).result(timeout=self.request_timeout)
+
+    def predict(self, batch, verbose=0):
+        return self.predict_on_batch(batch)
+
+    def close(self):
+        """Stop all workers"""
+        for request_queue in self._request_queues:
+            request_queue.put(None)
+        for process in self._processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
+        self._response_queue.put(None)
@@ -0,0 +1,284 @@
+import gzip
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import Conv2D, Dense, DepthwiseConv2D
+from tensorflow.keras.optimizers import Adam
+
+from tflite_export import load_tflite_model, measure_latency_ms
+
+# Layers whose kernels are pruned and clustered
+PRUNABLE_LAYERS = (Conv2D, DepthwiseConv2D, Dense)
+
+
+def _tfmot():
+    """
+    Import tensorflow-model-optimization, which is only needed for compression.
+
+    tfmot wraps Keras 2 layers; with TensorFlow 2.16+ install tf_keras and set
+    TF_USE_LEGACY_KERAS=1 before TensorFlow is imported.
+    """
+    try:
+        import tensorflow_model_optimization as tfmot
+    except ImportError as e:
+        raise ImportError(
+            "Pruning and clustering require tensorflow-model-optimization: "
+            "pip install tensorflow-model-optimization"
+        ) from e
+    return tfmot
+
+
+def _supports(layer, structured=False):
+    """Whether a layer's kernel can be compressed; m:n sparsity excludes depthwise kernels."""
+    if structured and isinstance(layer, DepthwiseConv2D):
+        return False
+    return isinstance(layer, PRUNABLE_LAYERS)
+
+
+def _wrap_layers(model, wrap, trainable_only, structured=False):
+    """
+    Copy `model` and pass its supported layers through `wrap`.
+
+    The wrappers modify kernels in place, so they are applied to a copy with
+    its own weights; the original model stays dense.
+    """
+    copy = tf.keras.models.clone_model(model)
+    copy.set_weights(model.get_weights())
+    for source, layer in zip(model.layers, copy.layers):
+        layer.trainable = source.trainable
+
+    def clone_layer(layer):
+        if _supports(layer, structured) and (layer.trainable or not trainable_only):
+            return wrap(layer)
+        return layer
+
+    return tf.keras.models.clone_model(copy, clone_function=clone_layer)
+
+
+def prune_model(
+    model,
+    target_sparsity=0.5,
+    end_step=1000,
+    begin_step=0,
+    frequency=100,
+    structure=None,
+    trainable_only=True,
+):
+    """
+    Wrap the model's kernels for magnitude pruning with a polynomial sparsity schedule.
+
+    Args:
+        model (tf.keras.Model): Trained classifier
+        target_sparsity (float): Final fraction of zeroed weights (unstructured pruning)
+        end_step (int): Training step at which the target is reached, e.g.
+            epochs * len(train_data)
+        begin_step (int): Step at which pruning starts
+        frequency (int): Steps between mask updates
+        structure (tuple): (m, n) for structured m:n sparsity, e.g. (2, 4); depthwise
+            kernels are left dense and target_sparsity is ignored
+        trainable_only (bool): Only prune layers that are trainable, i.e. those
+            unfrozen for fine-tuning; False prunes (and unfreezes) every kernel
+
+    Returns:
+        tf.keras.Model: Model with pruning wrappers, to be fine-tuned with fine_tune_compressed
+    """
+    tfmot = _tfmot()
+    schedule = tfmot.sparsity.keras.PolynomialDecay(
+        initial_sparsity=0.0,
+        final_sparsity=target_sparsity,
+        begin_step=begin_step,
+        end_step=end_step,
+        frequency=frequency,
+    )
+
+    def wrap(layer):
+        layer.trainable = True
+        if structure:
+            return tfmot.sparsity.keras.prune_low_magnitude(
+                layer, pruning_schedule=schedule, sparsity_m_by_n=tuple(structure)
+            )
+        return tfmot.sparsity.keras.prune_low_magnitude(layer, pruning_schedule=schedule)
+
+    return _wrap_layers(model, wrap, trainable_only, structured=bool(structure))
+
+
+def cluster_model(model, number_of_clusters=16, preserve_sparsity=True, trainable_only=True):
+    """
+    Wrap the model's kernels for weight clustering (weight sharing).
+
+    Each kernel is reduced to `number_of_clusters` distinct values, which
+    compresses well on disk. Apply to a stripped model; with preserve_sparsity
+    the zeros of a previously pruned model are kept.
+
+    Returns:
+        tf.keras.Model: Model with clustering wrappers, to be fine-tuned with fine_tune_compressed
+    """
+    tfmot = _tfmot()
+    params = {
+        "number_of_clusters": number_of_clusters,
+        "cluster_centroids_init": tfmot.clustering.keras.CentroidInitialization.KMEANS_PLUS_PLUS,
+    }
+    if preserve_sparsity:
+        from tensorflow_model_optimization.python.core.clustering.keras.experimental import (
+            cluster as experimental_cluster,
+        )
+
+        def wrap(layer):
+            return experimental_cluster.cluster_weights(layer, preserve_sparsity=True, **params)
+
+    else:
+
+        def wrap(layer):
+            return tfmot.clustering.keras.cluster_weights(layer, **params)
+
+    return _wrap_layers(model, wrap, trainable_only)
+
+
+def fine_tune_compressed(model, train_data, val_data, epochs=5, learning_rate=1e-5, callbacks=None):
+    """
+    Fine-tune a pruned or clustered model so accuracy recovers from the compression.
+
+    For a pruned model UpdatePruningStep is added, which advances the
+    sparsity schedule. Checkpoint callbacks should save weights only: the
+    wrappers are only stripped after training.
+
+    Returns:
+        tf.keras.callbacks.History: History of the fine-tuning run
+    """
+    tfmot = _tfmot()
+    callbacks = list(callbacks or [])
+    if any(type(layer).__name__ == "PruneLowMagnitude" for layer in model.layers):
+        callbacks.append(tfmot.sparsity.keras.UpdatePruningStep())
+
+    model.compile(
+        optimizer=Adam(learning_rate=learning_rate),
+        loss="categorical_crossentropy",
+        metrics=["accuracy", "Precision", "Recall"],
+    )
+    return model.fit(
+        train_data, validation_data=val_data, epochs=epochs, callbacks=callbacks, verbose=1
+    )
+
+
+def strip_wrappers(model):
+    """Remove pruning and clustering wrappers, leaving plain Keras layers with compressed kernels."""
+    tfmot = _tfmot()
+    model = tfmot.sparsity.keras.strip_pruning(model)
+    return tfmot.clustering.keras.strip_clustering(model)
+
+
+def sparsity_summary(model):
+    """Fraction of zero weights over all kernels of PRUNABLE_LAYERS."""
+    zeros = total = 0
+    for layer in model.layers:
+        if isinstance(layer, PRUNABLE_LAYERS):
+            kernel = layer.weights[0].numpy()
+            zeros += int(np.sum(kernel == 0))
+            total += kernel.size
+    return zeros / max(total, 1)
+
+
+def export_compressed(model, output_dir, model_name="efficientnetb0_compressed"):
+    """
+    Save a stripped model as .keras and as a sparsity-aware dynamic-range .tflite.
+
+    The .keras archive stores zeros and shared values uncompressed, so its gain
+    shows in the gzip size (container image layers are gzip-compressed). The
+    TFLite converter encodes sparse kernels compactly, so that file is smaller
+    on disk as well; app.py serves either.
+
+    Returns:
+        dict: Format ("keras", "tflite") -> exported file path
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    keras_path = os.path.join(output_dir, f"{model_name}.keras")
+    model.save(keras_path)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT, tf.lite.Optimize.EXPERIMENTAL_SPARSITY]
+    tflite_path = os.path.join(output_dir, f"{model_name}.tflite")
+    with open(tflite_path, "wb") as f:
+        f.write(converter.convert())
+
+    for path in (keras_path, tflite_path):
+        print(f"Saved {path} ({os.path.getsize(path) / 1e6:.1f} MB)")
+    return {"keras": keras_path, "tflite": tflite_path}
+
+
+def _gzip_size_mb(path):
+    with open(path, "rb") as f:
+        return len(gzip.compress(f.read(), compresslevel=6)) / 1e6
+
+
+def _load_artifact(path):
+    """Load a .keras or .tflite artifact; returns (predict_fn, load_seconds)."""
+    start = time.perf_counter()
+    if path.endswith(".tflite"):
+        predict_fn = load_tflite_model(path).predict_on_batch
+    else:
+        predict_fn = tf.keras.models.load_model(path, compile=False).predict_on_batch
+    return predict_fn, time.perf_counter() - start
+
+
+def compression_report(artifact_paths, test_data, latency_iterations=50):
+    """
+    Compare saved artifacts on size, load time, CPU latency and test accuracy.
+
+    Args:
+        artifact_paths (dict): Name -> .keras or .tflite path; the first entry
+            (the dense model) is the reference for the deltas
+        test_data (tf.data.Dataset): Batched, one-hot labelled test split
+        latency_iterations (int): Batch-1 calls used to time each model
+
+    Returns:
+        dict: Per-artifact size_mb, gzip_mb, load_s, latency_ms, accuracy and accuracy_delta
+    """
+    # Streamed once per artifact, so only one batch is held in memory at a time
+    single_image = None
+    report = {}
+    reference_accuracy = None
+    for name, path in artifact_paths.items():
+        predict_fn, load_s = _load_artifact(path)
+        correct = total = 0
+        for image_batch, label_batch in test_data:
+            image_batch = image_batch.numpy()
+            if single_image is None:
+                single_image = image_batch[:1].copy()
+            preds = np.argmax(predict_fn(image_batch), axis=1)
+            correct += int(np.sum(preds == np.argmax(label_batch.numpy(), axis=1)))
+            total += len(preds)
+        accuracy = correct / total
+        if reference_accuracy is None:
+            reference_accuracy = accuracy
+
+        report[name] = {
+            "size_mb": os.path.getsize(path) / 1e6,
+            "gzip_mb": _gzip_size_mb(path),
+            "load_s": load_s,
+            "latency_ms": measure_latency_ms(predict_fn, single_image, latency_iterations),
+            "accuracy": accuracy,
+            "accuracy_delta": accuracy - reference_accuracy,
+        }
+
+    return report
+
+
+def print_compression_report(report):
+    """Print the comparison produced by compression_report."""
+    print("\n" + "=" * 90)
+    print("COMPRESSION REPORT")
+    print("=" * 90)
+    print(
+        f"{'Model':<22} | {'Size MB':>8} | {'Gzip MB':>8} | {'Load s':>7} | "
+        f"{'Latency ms':>10} | {'Accuracy':>9} | {'Delta':>8}"
+    )
+    print("-" * 90)
+    for name, row in report.items():
+        print(
+            f"{name:<22} | {row['size_mb']:>8.1f} | {row['gzip_mb']:>8.1f} | {row['load_s']:>7.2f} | "
+            f"{row['latency_ms']:>10.2f} | {row['accuracy']:>9.4f} | {row['accuracy_delta']:>+8.4f}"
+        )
+    print("=" * 90)
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import tempfile
+
+INDEX_FILE = ".dataset_index.json"
+INDEX_VERSION = 1
+
+
+def _file_hash(path):
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class DatasetIndex:
+    """
+    Persistent listing of every image in a split/class directory tree.
+
+    Each entry records path (relative to the root), split, class, size, mtime
+    and optionally a SHA-1 of the contents. refresh() only rescans class
+    directories whose mtime changed (adding, removing or renaming a file
+    updates it), so an unchanged tree costs one stat per directory instead
+    of one per file. The index is stored as INDEX_FILE inside the root.
+    """
+
+    def __init__(self, root, splits, extensions, with_hash=False):
+        """
+        Args:
+            root (str): Dataset directory containing one directory per split
+            splits (list): Split directory names
+            extensions (tuple): Lower-case image file extensions to index
+            with_hash (bool): Also record a content hash of every file
+        """
+        self.root = root
+        self.splits = list(splits)
+        self.extensions = tuple(extensions)
+        self.with_hash = with_hash
+        self.dirs = {}
+        self.entries = {}
+
+    @property
+    def path(self):
+        return os.path.join(self.root, INDEX_FILE)
+
+    def load(self):
+        """Read the stored index; returns False if there is none (or it is unusable)."""
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_VERSION or tuple(data["extensions"]) != self.extensions:
+            return False
+        self.dirs = data["dirs"]
+        self.entries = {entry["path"]: entry for entry in data["files"]}
+        return True
+
+    def save(self):
+        """Write the index atomically next to the data."""
+        data = {
+            "version": INDEX_VERSION,
+            "extensions": list(self.extensions),
+            "dirs": self.dirs,
+            "files": sorted(self.entries.values(), key=lambda entry: entry["path"]),
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def refresh(self, full=False):
+        """
+        Bring the index up to date with the directory tree.
+
+        Args:
+            full (bool): Rescan every class directory, e.g. after files were
+                overwritten in place (which leaves directory mtimes unchanged).
+                Unchanged files still keep their entries and hashes.
+
+        Returns:
+            int: Number of class directories that had to be rescanned
+        """
+        dirs = {}
+        rescanned = 0
+
+        for split in self.splits:
+            split_path = os.path.join(self.root, split)
+            with os.scandir(split_path) as it:
+                class_dirs = sorted(entry.name for entry in it if entry.is_dir())
+
+            for class_name in class_dirs:
+                rel_dir = f"{split}/{class_name}"
+                mtime = os.stat(os.path.join(split_path, class_name)).st_mtime_ns
+                dirs[rel_dir] = mtime
+                if full or self.dirs.get(rel_dir) != mtime:
+                    self._rescan(split, class_name)
+                    rescanned += 1
+
+        # Drop entries of class directories that no longer exist
+        self.entries = {
+            path: entry
+            for path, entry in self.entries.items()
+            if f"{entry['split']}/{entry['class']}" in dirs
+        }
+        self.dirs = dirs
+
+        if rescanned or not os.path.exists(self.path):
+            self.save()
+        return rescanned
+
+    def _rescan(self, split, class_name):
+        """Re-list one class directory, reusing entries whose size and mtime are unchanged."""
+        rel_dir = f"{split}/{class_name}"
+        previous = {
+            path: entry for path, entry in self.entries.items() if path.startswith(rel_dir + "/")
+        }
+        for path in previous:
+            del self.entries[path]
+
+        with os.scandir(os.path.join(self.root, split, class_name)) as it:
+            for file_entry in it:
+                if not file_entry.name.lower().endswith(self.extensions):
+                    continue
+                path = f"{rel_dir}/{file_entry.name}"
+                stat = file_entry.stat()
+                old = previous.get(path)
+                if old and old["size"] == stat.st_size and old["mtime"] == stat.st_mtime_ns:
+                    entry = old
+                else:
+                    entry = {
+                        "path": path,
+                        "split": split,
+                        "class": class_name,
+                        "size": stat.st_size,
+                        "mtime": stat.st_mtime_ns,
+                    }
+                if self.with_hash and "sha1" not in entry:
+                    entry["sha1"] = _file_hash(file_entry.path)
+                self.entries[path] = entry
+
+    def split_entries(self, split, extensions=None):
+        """Entries of one split sorted by path, optionally limited to some extensions."""
+        return [
+            entry
+            for path, entry in sorted(self.entries.items())
+            if entry["split"] == split
+            and (extensions is None or path.lower().endswith(tuple(extensions)))
+        ]
+
+    def count(self, split):
+        return sum(1 for entry in self.entries.values() if entry["split"] == split)
+
+    def class_names(self, split):
+        """Sorted class directory names of a split."""
+        prefix = f"{split}/"
+        return sorted(rel_dir[len(prefix):] for rel_dir in self.dirs if rel_dir.startswith(prefix))
+
+    def files_and_labels(self, split, class_names, extensions=None):
+        """Absolute paths and class indices for one split."""
+        class_to_index = {name: i for i, name in enumerate(class_names)}
+        entries = [
+            entry for entry in self.split_entries(split, extensions) if entry["class"] in class_to_index
+        ]
+        paths = [os.path.join(self.root, entry["path"]) for entry in entries]
+        labels = [class_to_index[entry["class"]] for entry in entries]
+        return paths, labels
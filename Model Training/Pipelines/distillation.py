@@ -0,0 +1,353 @@
+import json
+import os
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.applications import MobileNetV2
+from tensorflow.keras.layers import Activation, Dense, Dropout, GlobalAveragePooling2D
+from tensorflow.keras.models import Model
+from tensorflow.keras.optimizers import Adam
+
+from evaluation import evaluate_models
+from feature_cache import dataset_signature, weights_fingerprint
+from processing_pipeline import build_augmentation
+from tflite_export import measure_latency_ms
+
+
+def create_student_model(
+    input_shape=(256, 256, 3),
+    num_classes=7,
+    alpha=0.5,
+    image_size=(160, 160),
+    weights="imagenet",
+    verbose=True,
+):
+    """
+    Create a compact MobileNetV2 student for knowledge distillation.
+
+    The student takes the same raw 256x256 pixels as the deployed model and
+    resizes them inside the graph, so app.py can serve it unchanged. Both
+    width (alpha) and resolution are reduced to cut CPU cost.
+
+    Args:
+        input_shape (tuple): Serving input shape (height, width, channels)
+        num_classes (int): Number of output classes
+        alpha (float): MobileNetV2 width multiplier (ImageNet weights exist for
+            0.35, 0.5, 0.75, 1.0, 1.3 and 1.4)
+        image_size (tuple): Resolution the backbone runs at (96, 128, 160, 192 or 224
+            for ImageNet weights)
+        weights (str): Backbone weights, or None for a randomly initialised student
+        verbose (bool): Print a parameter summary
+
+    Returns:
+        tuple: (student, logits_model) - the softmax model to save and serve, and a
+        model sharing its weights that outputs the pre-softmax logits for training
+    """
+    inputs = tf.keras.layers.Input(shape=input_shape)
+    x = tf.keras.layers.Resizing(*image_size)(inputs)
+    x = tf.keras.applications.mobilenet_v2.preprocess_input(x)
+
+    backbone = MobileNetV2(
+        alpha=alpha,
+        weights=weights,
+        include_top=False,
+        input_tensor=x,
+    )
+
+    x = GlobalAveragePooling2D()(backbone.output)
+    x = Dropout(0.2)(x)
+    # Logits and softmax in float32 keep the temperature-scaled loss stable under mixed precision
+    logits = Dense(num_classes, dtype="float32", name="logits")(x)
+    predictions = Activation("softmax", dtype="float32", name="probabilities")(logits)
+
+    student = Model(inputs=inputs, outputs=predictions, name=f"mobilenetv2_{alpha}_student")
+    logits_model = Model(inputs=inputs, outputs=logits)
+
+    if verbose:
+        print(f"✅ Student created: MobileNetV2 alpha={alpha} at {image_size[0]}x{image_size[1]}")
+        print(f"📊 Total parameters: {student.count_params():,}")
+
+    return student, logits_model
+
+
+def teacher_logits_fn(teacher):
+    """
+    Return images -> teacher logits.
+
+    For the usual softmax Dense head the exact logits are recomputed from the
+    penultimate activations; otherwise log-probabilities are used, which give
+    the same temperature-scaled softmax.
+    """
+    last = teacher.layers[-1]
+    if isinstance(last, Dense) and getattr(last.activation, "__name__", "") == "softmax":
+        penultimate = Model(teacher.inputs, last.input)
+        kernel = last.kernel.numpy().astype(np.float32)
+        bias = last.bias.numpy().astype(np.float32)
+        return lambda images: penultimate.predict_on_batch(images).astype(np.float32) @ kernel + bias
+
+    return lambda images: np.log(np.clip(teacher.predict_on_batch(images), 1e-7, 1.0))
+
+
+class TeacherLogitStore:
+    """
+    Memory-mapped images and teacher logits for one split.
+
+    Layout in `store_dir`: images.npy (uint8), logits.npy, labels.npy and
+    index.json holding the dataset signature, teacher fingerprint and image
+    count. The index is written last, so an interrupted build is never
+    mistaken for a finished one.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.images_path = os.path.join(store_dir, "images.npy")
+        self.logits_path = os.path.join(store_dir, "logits.npy")
+        self.labels_path = os.path.join(store_dir, "labels.npy")
+        self.index_path = os.path.join(store_dir, "index.json")
+
+    def matches(self, signature, teacher_key):
+        """Check whether the store was built from the same images and teacher."""
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path) as f:
+            index = json.load(f)
+        return index["signature"] == signature and index["teacher"] == teacher_key
+
+    def build(self, teacher, dataset, teacher_key):
+        """
+        Run the teacher once over every image.
+
+        Images, logits and labels are taken from the same batches, so a
+        shuffled dataset can be cached in a single pass. Pass un-augmented data.
+        """
+        os.makedirs(self.store_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+
+        logits_fn = teacher_logits_fn(teacher)
+        images_out = None
+        logit_batches, label_batches = [], []
+        count = 0
+
+        for images, labels in dataset:
+            images = images.numpy()
+            if images_out is None:
+                # The last batch may be smaller, so the first batch bounds the total
+                images_out = np.lib.format.open_memmap(
+                    self.images_path,
+                    mode="w+",
+                    dtype=np.uint8,
+                    shape=(len(dataset) * len(images), *images.shape[1:]),
+                )
+            images_out[count : count + len(images)] = np.clip(np.round(images), 0, 255)
+            logit_batches.append(logits_fn(images))
+            label_batches.append(np.argmax(labels.numpy(), axis=-1))
+            count += len(images)
+
+        images_out.flush()
+        del images_out
+        np.save(self.logits_path, np.concatenate(logit_batches).astype(np.float32))
+        np.save(self.labels_path, np.concatenate(label_batches))
+        with open(self.index_path, "w") as f:
+            json.dump(
+                {"signature": dataset_signature(dataset), "teacher": teacher_key, "count": count}, f
+            )
+
+        print(f"Cached teacher logits for {count} images")
+
+    def load(self):
+        """Return (images, logits, labels); images are memory-mapped, not read into RAM."""
+        with open(self.index_path) as f:
+            count = json.load(f)["count"]
+        images = np.load(self.images_path, mmap_mode="r")[:count]
+        return images, np.load(self.logits_path), np.load(self.labels_path)
+
+
+def cached_teacher_logits(teacher, dataset, store_dir, teacher_key):
+    """Load a split's images and teacher logits from the store, building it first if needed."""
+    store = TeacherLogitStore(store_dir)
+    if store.matches(dataset_signature(dataset), teacher_key):
+        print(f"Using cached teacher logits from: {store_dir}")
+    else:
+        print(f"Building teacher logit cache in: {store_dir}")
+        store.build(teacher, dataset, teacher_key)
+    return store.load()
+
+
+def distillation_loss(num_classes, temperature=4.0, alpha=0.1):
+    """
+    Hinton et al. distillation loss on targets packed as [one-hot labels, teacher logits].
+
+    alpha weights the hard-label cross-entropy; the remainder goes to the KL
+    divergence between temperature-softened teacher and student distributions,
+    scaled by temperature**2 to keep its gradients comparable.
+    """
+
+    def loss(y_true, student_logits):
+        labels, teacher_logits = y_true[:, :num_classes], y_true[:, num_classes:]
+        hard = tf.keras.losses.categorical_crossentropy(labels, student_logits, from_logits=True)
+        soft = tf.keras.losses.kl_divergence(
+            tf.nn.softmax(teacher_logits / temperature),
+            tf.nn.softmax(student_logits / temperature),
+        )
+        return alpha * hard + (1.0 - alpha) * temperature**2 * soft
+
+    return loss
+
+
+def label_accuracy(num_classes):
+    """Accuracy against the hard labels of packed distillation targets."""
+
+    def accuracy(y_true, student_logits):
+        return tf.keras.metrics.categorical_accuracy(y_true[:, :num_classes], student_logits)
+
+    return accuracy
+
+
+def _store_dataset(images, targets, batch_size, shuffle, augmentation=None):
+    """Batches from memory-mapped images, read with one gather per batch."""
+
+    def gather(indices):
+        # Sorted indices turn random row reads into forward reads of the memmap
+        indices = np.sort(indices)
+        return np.asarray(images[indices]), targets[indices]
+
+    def load_batch(indices):
+        batch_images, batch_targets = tf.numpy_function(
+            gather, [indices], [tf.uint8, tf.float32]
+        )
+        batch_images.set_shape([None, *images.shape[1:]])
+        batch_targets.set_shape([None, targets.shape[1]])
+        return tf.cast(batch_images, tf.float32), batch_targets
+
+    dataset = tf.data.Dataset.range(len(images))
+    if shuffle:
+        dataset = dataset.shuffle(len(images), reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(load_batch, num_parallel_calls=tf.data.AUTOTUNE)
+    if augmentation is not None:
+        dataset = dataset.map(
+            lambda x, y: (augmentation(x, training=True), y),
+            num_parallel_calls=tf.data.AUTOTUNE,
+        )
+    return dataset.prefetch(tf.data.AUTOTUNE)
+
+
+def train_distilled_student(
+    teacher,
+    logits_model,
+    train_data,
+    val_data,
+    cache_dir,
+    epochs=30,
+    temperature=4.0,
+    alpha=0.1,
+    batch_size=32,
+    learning_rate=0.001,
+    augmentation=None,
+    callbacks=None,
+):
+    """
+    Train a student on the teacher's soft targets, next to train_transfer_learning_model.
+
+    The teacher runs once per image: its logits are cached with the decoded
+    images and reused every epoch. Augmentation is applied to the student's
+    input after the cache, so the teacher's targets come from the clean image.
+
+    Args:
+        teacher (tf.keras.Model): Trained EfficientNetB0 or ResNet50 model
+        logits_model (tf.keras.Model): Student logits model from create_student_model;
+            training it updates the student in place
+        train_data, val_data (tf.data.Dataset): Batched, un-augmented (images, one-hot
+            labels) datasets
+        cache_dir (str): Root directory of the teacher logit store
+        epochs (int): Training epochs
+        temperature (float): Softmax temperature of the soft targets
+        alpha (float): Weight of the hard-label loss (1 - alpha goes to the soft targets)
+        batch_size (int): Student batch size
+        learning_rate (float): Adam learning rate
+        augmentation (tf.keras.layers.Layer): Training augmentation; defaults to
+            build_augmentation(), pass False to disable
+        callbacks (list): Keras callbacks; checkpoints written here contain the logits
+            model, whose weights are the student's
+
+    Returns:
+        tf.keras.callbacks.History: History of the distillation run
+    """
+    if augmentation is None:
+        augmentation = build_augmentation()
+    elif augmentation is False:
+        augmentation = None
+
+    teacher_key = f"{teacher.name}_{weights_fingerprint(teacher)}"
+    splits = {}
+    for split, dataset in (("train", train_data), ("val", val_data)):
+        images, logits, labels = cached_teacher_logits(
+            teacher, dataset, os.path.join(cache_dir, teacher_key, split), teacher_key
+        )
+        num_classes = logits.shape[1]
+        # Packed targets let a standard compile/fit carry the teacher logits
+        targets = np.concatenate(
+            [np.eye(num_classes, dtype=np.float32)[labels], logits], axis=1
+        )
+        splits[split] = (images, targets)
+
+    train_ds = _store_dataset(*splits["train"], batch_size, shuffle=True, augmentation=augmentation)
+    val_ds = _store_dataset(*splits["val"], batch_size, shuffle=False)
+
+    logits_model.compile(
+        optimizer=Adam(learning_rate=learning_rate),
+        loss=distillation_loss(num_classes, temperature, alpha),
+        metrics=[label_accuracy(num_classes)],
+    )
+    return logits_model.fit(
+        train_ds, validation_data=val_ds, epochs=epochs, callbacks=callbacks, verbose=1
+    )
+
+
+def distillation_report(models, test_data, artifact_paths=None, latency_iterations=50):
+    """
+    Compare teacher and student(s) on the test split.
+
+    Args:
+        models (dict): Model name -> tf.keras.Model (e.g. teacher and student)
+        test_data (tf.data.Dataset): Batched, one-hot labelled test split
+        artifact_paths (dict): Optional model name -> saved .keras path, for file sizes
+        latency_iterations (int): Batch-1 calls used to time each model
+
+    Returns:
+        dict: Per-model accuracy, macro F1, batch-1 latency, parameters and file size
+    """
+    artifact_paths = artifact_paths or {}
+    metrics = evaluate_models(models, test_data)
+    single_image = next(iter(test_data))[0][:1]
+
+    report = {}
+    for name, model in models.items():
+        path = artifact_paths.get(name)
+        report[name] = {
+            "accuracy": metrics[name]["accuracy"],
+            "macro_f1": float(np.mean(metrics[name]["class_f1"])),
+            "latency_ms": measure_latency_ms(model.predict_on_batch, single_image, latency_iterations),
+            "params": model.count_params(),
+            "size_mb": os.path.getsize(path) / 1e6 if path else None,
+        }
+    return report
+
+
+def print_distillation_report(report):
+    """Print the comparison produced by distillation_report."""
+    print("\n" + "=" * 80)
+    print("DISTILLATION REPORT")
+    print("=" * 80)
+    print(
+        f"{'Model':<20} | {'Accuracy':>9} | {'Macro F1':>8} | {'Latency ms':>10} | "
+        f"{'Params':>10} | {'Size MB':>8}"
+    )
+    print("-" * 80)
+    for name, row in report.items():
+        size = f"{row['size_mb']:.1f}" if row["size_mb"] is not None else "-"
+        print(
+            f"{name:<20} | {row['accuracy']:>9.4f} | {row['macro_f1']:>8.4f} | "
+            f"{row['latency_ms']:>10.2f} | {row['params']:>10,} | {size:>8}"
+        )
+    print("=" * 80)
@@ -0,0 +1,141 @@
+import numpy as np
+
+# Keras' Precision/Recall metrics count a class as predicted when its probability exceeds this
+THRESHOLD = 0.5
+EPSILON = 1e-7
+
+
+def collect_predictions(models, dataset):
+    """
+    Run every model over a dataset in one streaming pass.
+
+    Each batch is decoded once and fed to all models with predict_on_batch,
+    so there is no per-batch predict-loop setup. Results go straight into
+    preallocated arrays.
+
+    Args:
+        models (dict): Model name -> tf.keras.Model
+        dataset (tf.data.Dataset): Batched (images, one-hot labels) dataset
+
+    Returns:
+        tuple: (labels, probabilities) where labels is an (N, num_classes) array
+        and probabilities maps each model name to an (N, num_classes) array
+    """
+    labels = None
+    probabilities = {}
+    count = 0
+
+    for images, batch_labels in dataset:
+        batch_labels = batch_labels.numpy()
+        batch_size, num_classes = batch_labels.shape
+
+        if labels is None:
+            # The last batch may be smaller, so the first batch bounds the total
+            capacity = len(dataset) * batch_size
+            labels = np.empty((capacity, num_classes), dtype=np.float32)
+            probabilities = {
+                name: np.empty((capacity, num_classes), dtype=np.float32) for name in models
+            }
+
+        labels[count : count + batch_size] = batch_labels
+        for name, model in models.items():
+            probabilities[name][count : count + batch_size] = model.predict_on_batch(images)
+        count += batch_size
+
+    if labels is None:
+        raise ValueError("Cannot evaluate on an empty dataset.")
+
+    return labels[:count], {name: probs[:count] for name, probs in probabilities.items()}
+
+
+def compute_metrics(labels, probabilities):
+    """
+    Compute the evaluation metrics from one-hot labels and predicted probabilities.
+
+    Loss, accuracy, precision and recall follow the definitions of the Keras
+    metrics the models are compiled with, so the numbers match model.evaluate.
+
+    Returns:
+        dict: loss, accuracy, precision, recall, f1, confusion_matrix and the
+        per-class precision, recall, f1 and support arrays
+    """
+    num_classes = labels.shape[1]
+    y_true = labels.argmax(axis=1)
+    y_pred = probabilities.argmax(axis=1)
+
+    clipped = np.clip(probabilities, EPSILON, 1 - EPSILON)
+    loss = float(-np.mean(np.sum(labels * np.log(clipped), axis=1)))
+    accuracy = float(np.mean(y_true == y_pred))
+
+    # Micro-averaged over all (sample, class) pairs, like keras.metrics.Precision/Recall
+    predicted = probabilities > THRESHOLD
+    actual = labels > 0.5
+    true_positives = np.sum(predicted & actual)
+    precision = float(true_positives / max(np.sum(predicted), 1))
+    recall = float(true_positives / max(np.sum(actual), 1))
+    f1 = 2 * precision * recall / (precision + recall + EPSILON)
+
+    cm = np.bincount(y_true * num_classes + y_pred, minlength=num_classes**2).reshape(
+        num_classes, num_classes
+    )
+    correct = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1)
+    class_precision = correct / np.maximum(cm.sum(axis=0), 1)
+    class_recall = correct / np.maximum(support, 1)
+    class_f1 = 2 * class_precision * class_recall / np.maximum(class_precision + class_recall, EPSILON)
+
+    return {
+        "loss": loss,
+        "accuracy": accuracy,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "confusion_matrix": cm,
+        "class_precision": class_precision,
+        "class_recall": class_recall,
+        "class_f1": class_f1,
+        "support": support,
+    }
+
+
+def format_report(metrics, class_names, digits=4):
+    """Per-class report in the layout of sklearn's classification_report."""
+    width = max(len(name) for name in [*class_names, "weighted avg"])
+    header = f"{'':>{width}} {'precision':>9} {'recall':>9} {'f1-score':>9} {'support':>9}"
+    lines = [header, ""]
+
+    for i, name in enumerate(class_names):
+        lines.append(
+            f"{name:>{width}} {metrics['class_precision'][i]:>9.{digits}f} "
+            f"{metrics['class_recall'][i]:>9.{digits}f} {metrics['class_f1'][i]:>9.{digits}f} "
+            f"{metrics['support'][i]:>9}"
+        )
+
+    support = metrics["support"]
+    total = int(support.sum())
+    weights = support / max(total, 1)
+    lines.append("")
+    lines.append(f"{'accuracy':>{width}} {'':>9} {'':>9} {metrics['accuracy']:>9.{digits}f} {total:>9}")
+    for label, average in (("macro avg", np.mean), ("weighted avg", lambda v: np.sum(v * weights))):
+        lines.append(
+            f"{label:>{width}} {average(metrics['class_precision']):>9.{digits}f} "
+            f"{average(metrics['class_recall']):>9.{digits}f} "
+            f"{average(metrics['class_f1']):>9.{digits}f} {total:>9}"
+        )
+
+    return "\n".join(lines)
+
+
+def evaluate_models(models, dataset):
+    """
+    Evaluate several models with a single decode pass over the dataset.
+
+    Args:
+        models (dict): Model name -> tf.keras.Model
+        dataset (tf.data.Dataset): Batched (images, one-hot labels) dataset
+
+    Returns:
+        dict: Model name -> compute_metrics() result
+    """
+    labels, probabilities = collect_predictions(models, dataset)
+    return {name: compute_metrics(labels, probs) for name, probs in probabilities.items()}
@@ -0,0 +1,243 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.layers import GlobalAveragePooling2D
+from tensorflow.keras.optimizers import Adam
+
+from processing_pipeline import build_augmentation
+
+
+def weights_fingerprint(model):
+    """Hash a model's weights, so cached features are invalidated if the backbone changes."""
+    digest = hashlib.sha1()
+    for weight in model.weights:
+        digest.update(weight.numpy().tobytes())
+    return digest.hexdigest()[:12]
+
+
+def find_augmentation(model):
+    """Return the in-model augmentation Sequential, or None if the model has none."""
+    for layer in model.layers:
+        if isinstance(layer, tf.keras.Sequential):
+            return layer
+    return None
+
+
+def split_head(model):
+    """
+    Split a transfer-learning model at its GlobalAveragePooling2D layer.
+
+    Returns:
+        tuple: (feature_extractor, head) where feature_extractor maps images to
+        pooled backbone features and head maps those features to class
+        probabilities. The head reuses the layer objects of `model`, so
+        training it updates the full model in place.
+    """
+    pooling_index = next(
+        i for i, layer in enumerate(model.layers) if isinstance(layer, GlobalAveragePooling2D)
+    )
+    pooling = model.layers[pooling_index]
+    feature_extractor = tf.keras.Model(model.inputs, pooling.output)
+
+    head_input = tf.keras.layers.Input(shape=pooling.output.shape[1:])
+    x = head_input
+    for layer in model.layers[pooling_index + 1 :]:
+        x = layer(x)
+    head = tf.keras.Model(head_input, x)
+
+    return feature_extractor, head
+
+
+def dataset_signature(dataset):
+    """
+    Identify the images behind a dataset, independent of its shuffle order.
+
+    File-backed datasets are identified by their sorted file list, datasets
+    read from TFRecords or the image store by their source metadata (split
+    sizes, stored image size, storage format and write time). The image
+    shape is always included, so a changed image_size invalidates the cache.
+    """
+    images_spec = dataset.element_spec[0]
+    signature = {
+        "class_names": list(getattr(dataset, "class_names", [])),
+        "batches": int(len(dataset)),
+        "image_shape": images_spec.shape.as_list(),
+    }
+    if hasattr(dataset, "file_paths"):
+        signature["file_paths"] = sorted(dataset.file_paths)
+    if hasattr(dataset, "source_metadata"):
+        signature["source"] = dataset.source_metadata
+    return signature
+
+
+class FeatureStore:
+    """
+    Memory-mapped store of pooled backbone features for one split.
+
+    Layout in `store_dir`: features.npy with shape (num_images, views, dim),
+    labels.npy with the class index of every row, and index.json holding the
+    dataset signature and view count. The index is written last, so an
+    interrupted build is never mistaken for a finished one.
+    """
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        self.features_path = os.path.join(store_dir, "features.npy")
+        self.labels_path = os.path.join(store_dir, "labels.npy")
+        self.index_path = os.path.join(store_dir, "index.json")
+
+    def matches(self, signature, views):
+        """Check whether the store was built from the same images and view count."""
+        if not os.path.exists(self.index_path):
+            return False
+        with open(self.index_path) as f:
+            index = json.load(f)
+        return index["signature"] == signature and index["views"] == views
+
+    def build(self, feature_extractor, dataset, views=1, augmentation=None):
+        """
+        Run the frozen backbone once per image (and per augmented view).
+
+        Features and labels are taken from the same batches, so a shuffled
+        dataset can be cached in a single pass.
+
+        Args:
+            feature_extractor (tf.keras.Model): Images -> pooled features
+            dataset (tf.data.Dataset): Batched (images, one-hot labels) dataset
+            views (int): Views per image; view 0 is clean, the rest are augmented
+            augmentation (tf.keras.layers.Layer): Augmentation used for views > 0
+        """
+        if views > 1 and augmentation is None:
+            raise ValueError("Cached augmented views require an augmentation layer.")
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            os.remove(self.index_path)
+
+        feature_batches = []
+        label_batches = []
+        for images, labels in dataset:
+            batch_features = [feature_extractor.predict_on_batch(images)]
+            for _ in range(1, views):
+                augmented = augmentation(images, training=True)
+                batch_features.append(feature_extractor.predict_on_batch(augmented))
+            feature_batches.append(np.stack(batch_features, axis=1))
+            label_batches.append(np.argmax(labels, axis=-1))
+
+        # Pooled features are small (num_images x views x ~1-2k floats), so a
+        # single write is cheaper than growing a memmap batch by batch
+        np.save(self.features_path, np.concatenate(feature_batches).astype(np.float32))
+        np.save(self.labels_path, np.concatenate(label_batches))
+        with open(self.index_path, "w") as f:
+            json.dump({"signature": dataset_signature(dataset), "views": views}, f)
+
+        print(f"Cached {views} view(s) of {sum(len(b) for b in label_batches)} images")
+
+    def load(self):
+        """Return (features, labels); features are memory-mapped, not read into RAM."""
+        return np.load(self.features_path, mmap_mode="r"), np.load(self.labels_path)
+
+
+def cached_features(feature_extractor, dataset, store_dir, views=1, augmentation=None):
+    """Load a split's features from the store, building it first if needed."""
+    store = FeatureStore(store_dir)
+    if store.matches(dataset_signature(dataset), views):
+        print(f"Using cached features from: {store_dir}")
+    else:
+        print(f"Building feature cache in: {store_dir}")
+        store.build(feature_extractor, dataset, views=views, augmentation=augmentation)
+    return store.load()
+
+
+def train_head_from_cache(
+    model,
+    base_model,
+    train_data,
+    val_data,
+    cache_dir,
+    epochs=20,
+    callbacks=None,
+    views=1,
+    batch_size=32,
+    learning_rate=0.001,
+    augmentation=None,
+):
+    """
+    Phase-1 training of the classification head on cached backbone features.
+
+    The frozen backbone runs once per image (and per cached augmented view)
+    instead of once per image per epoch. Each epoch samples one random view per
+    training image. The head layers are shared with `model`, so the full model
+    is ready for phase-2 fine-tuning afterwards.
+
+    Args:
+        model (tf.keras.Model): Full transfer-learning model
+        base_model (tf.keras.Model): Its frozen backbone (names and fingerprints the cache)
+        train_data, val_data (tf.data.Dataset): Batched (images, one-hot labels) datasets
+        cache_dir (str): Root directory of the feature store
+        epochs (int): Head training epochs
+        callbacks (list): Keras callbacks; checkpoints written here contain the head only
+        views (int): Cached views per training image (1 = no augmentation); view 0
+            is cached from train_data as given, so pass un-augmented data
+        batch_size (int): Head training batch size
+        learning_rate (float): Adam learning rate
+        augmentation (tf.keras.layers.Layer): Augmentation for the extra views;
+            defaults to the model's own augmentation layers or build_augmentation()
+
+    Returns:
+        tf.keras.callbacks.History: History of the head training run
+    """
+    feature_extractor, head = split_head(model)
+    image_size = tuple(model.input_shape[1:3])
+
+    key = f"{base_model.name}_{weights_fingerprint(base_model)}_{image_size[0]}x{image_size[1]}"
+    if augmentation is None:
+        augmentation = find_augmentation(model)
+    if augmentation is None:
+        augmentation = build_augmentation()
+
+    train_features, train_labels = cached_features(
+        feature_extractor,
+        train_data,
+        os.path.join(cache_dir, key, f"train_{views}v"),
+        views=views,
+        augmentation=augmentation,
+    )
+    val_features, val_labels = cached_features(
+        feature_extractor, val_data, os.path.join(cache_dir, key, "val")
+    )
+
+    num_classes = head.output_shape[-1]
+    train_features = tf.constant(train_features)
+    train_targets = tf.one_hot(train_labels, num_classes)
+
+    def sample_view(index):
+        view = tf.random.uniform([], maxval=views, dtype=tf.int32)
+        return train_features[index, view], train_targets[index]
+
+    train_ds = (
+        tf.data.Dataset.range(len(train_labels))
+        .shuffle(len(train_labels), reshuffle_each_iteration=True)
+        .map(sample_view, num_parallel_calls=tf.data.AUTOTUNE)
+        .batch(batch_size)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+    val_ds = (
+        tf.data.Dataset.from_tensor_slices(
+            (np.asarray(val_features[:, 0]), tf.one_hot(val_labels, num_classes))
+        )
+        .batch(batch_size)
+        .prefetch(tf.data.AUTOTUNE)
+    )
+
+    head.compile(
+        optimizer=Adam(learning_rate=learning_rate),
+        loss="categorical_crossentropy",
+        metrics=["accuracy", "Precision", "Recall"],
+    )
+    return head.fit(
+        train_ds, validation_data=val_ds, epochs=epochs, callbacks=callbacks, verbose=1
+    )
@@ -0,0 +1,122 @@
+import json
+import os
+
+import numpy as np
+import tensorflow as tf
+
+METADATA_FILE = "metadata.json"
+
+
+def _images_path(store_dir, split):
+    return os.path.join(store_dir, f"{split}_images.npy")
+
+
+def _labels_path(store_dir, split):
+    return os.path.join(store_dir, f"{split}_labels.npy")
+
+
+def write_split(records, store_dir, split, image_size, shuffle=False, seed=42):
+    """
+    Decode and resize one split once into a memory-mapped uint8 array.
+
+    Args:
+        records (list): (read_bytes, label) pairs, where read_bytes() returns encoded image bytes
+        store_dir (str): Destination directory
+        split (str): Split name used in the file names
+        image_size (tuple): Stored (height, width)
+        shuffle (bool): Store the images in random order
+        seed (int): Shuffle seed
+
+    Returns:
+        int: Number of images written
+    """
+    records = list(records)
+    if shuffle:
+        order = np.random.default_rng(seed).permutation(len(records))
+        records = [records[i] for i in order]
+
+    images = np.lib.format.open_memmap(
+        _images_path(store_dir, split),
+        mode="w+",
+        dtype=np.uint8,
+        shape=(len(records), *image_size, 3),
+    )
+    labels = np.empty(len(records), dtype=np.int64)
+
+    for i, (read_bytes, label) in enumerate(records):
+        image = tf.io.decode_image(read_bytes(), channels=3, expand_animations=False)
+        image = tf.image.resize(image, image_size)
+        images[i] = tf.cast(tf.round(image), tf.uint8).numpy()
+        labels[i] = label
+
+    images.flush()
+    del images
+    np.save(_labels_path(store_dir, split), labels)
+    return len(records)
+
+
+def write_metadata(store_dir, metadata):
+    with open(os.path.join(store_dir, METADATA_FILE), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def read_metadata(store_dir):
+    """Return the store metadata, or None if the store has not been written."""
+    path = os.path.join(store_dir, METADATA_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_split(store_dir, split, metadata, image_size, batch_size, shuffle):
+    """
+    Read one split back as a batched (images, one-hot labels) dataset.
+
+    Each batch is read from the memory-mapped array with a single gather, so
+    there is no decoding or resizing. For the training split the image order
+    is reshuffled every epoch, so batches are new combinations of images.
+
+    Args:
+        store_dir (str): Directory containing the arrays and metadata
+        split (str): Split name, e.g. "Training"
+        metadata (dict): Output of read_metadata
+        image_size (tuple): Output (height, width); resized on the fly if it differs
+        batch_size (int): Batch size
+        shuffle (bool): Shuffle the image order every epoch (training split)
+
+    Returns:
+        tf.data.Dataset: Batched dataset with a known cardinality, class_names and
+            source_metadata
+    """
+    images = np.load(_images_path(store_dir, split), mmap_mode="r")
+    labels = np.load(_labels_path(store_dir, split))
+    num_classes = len(metadata["class_names"])
+    stored_size = tuple(metadata["image_size"])
+
+    def gather(indices):
+        # Sorted indices turn random row reads into forward reads of the memmap
+        indices = np.sort(indices)
+        return np.asarray(images[indices]), labels[indices]
+
+    def to_tensors(indices):
+        batch, batch_labels = tf.numpy_function(gather, [indices], (tf.uint8, tf.int64))
+        batch = tf.cast(batch, tf.float32)
+        if stored_size != tuple(image_size):
+            batch = tf.image.resize(batch, image_size)
+        batch.set_shape((None, *image_size, 3))
+        return batch, tf.one_hot(batch_labels, num_classes)
+
+    dataset = tf.data.Dataset.range(len(labels))
+    if shuffle:
+        dataset = dataset.shuffle(len(labels), reshuffle_each_iteration=True)
+    dataset = dataset.batch(batch_size).map(to_tensors, num_parallel_calls=tf.data.AUTOTUNE)
+
+    dataset.class_names = list(metadata["class_names"])
+    # Identifies the arrays for cache signatures; the write time changes on regeneration
+    dataset.source_metadata = {
+        "format": "image_store",
+        "written": os.path.getmtime(os.path.join(store_dir, METADATA_FILE)),
+        **metadata,
+    }
+    return dataset
@@ -1,8 +1,74 @@
+import io
 import os
+import json
+import mmap
+import time
+import zlib
 import matplotlib.pyplot as plt
 import tensorflow as tf
 import zipfile
-from pathlib import Path
+
+import image_store
+import tfrecord_io
+from dataset_index import DatasetIndex
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".tiff")
+# Formats tf.io.decode_image can read (the same set image_dataset_from_directory accepts)
+DECODABLE_EXTENSIONS = (".bmp", ".gif", ".jpeg", ".jpg", ".png")
+SPLIT_DIRS = ["Training", "Validation", "Testing"]
+
+# "full" re-extracts everything, "incremental" skips unchanged files,
+# "zip" streams image bytes straight from the archive without extracting
+EXTRACTION_MODES = ("full", "incremental", "zip")
+
+# TFRecord shards per split (~200 images per training shard)
+DEFAULT_TFRECORD_SHARDS = {"Training": 16, "Validation": 4, "Testing": 8}
+
+
+class _MmapFile(io.RawIOBase):
+    """
+    Read-only, seekable file over a memory map.
+
+    zipfile calls seekable() on its file object, which mmap objects only
+    provide from Python 3.13 on.
+    """
+
+    def __init__(self, mapping):
+        self._mapping = mapping
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self._mapping.seek(offset, whence)
+        return self._mapping.tell()
+
+    def tell(self):
+        return self._mapping.tell()
+
+    def read(self, size=-1):
+        return self._mapping.read(size)
+
+    def readinto(self, buffer):
+        data = self._mapping.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+
+def build_augmentation():
+    """Data augmentation tailored for dental images."""
+    return tf.keras.Sequential(
+        [
+            tf.keras.layers.RandomFlip("horizontal"),
+            tf.keras.layers.RandomRotation(0.1),  # Reduced rotation for dental images
+            tf.keras.layers.RandomZoom(0.2),
+            tf.keras.layers.RandomTranslation(0.1, 0.1),  # Slight shifts
+        ],
+        name="data_augmentation",
+    )
 
 
 # Refined delivery pipeline
@@ -17,6 +83,17 @@ class DatasetPipeline:
         drive_dataset_path="/content/drive/MyDrive/Datasets/Teeth DataSet.zip",
         image_size=(256, 256),
         batch_size=32,
+        extraction_mode="incremental",
+        mmap_archive=False,
+        tfrecord_dir=None,
+        augment=True,
+        cache=None,
+        prefetch=True,
+        deterministic=False,
+        private_threadpool_size=None,
+        hash_files=False,
+        image_store_dir=None,
+        split_config=None,
     ):
         """
         Initialize the dataset pipeline.
@@ -25,14 +102,59 @@ class DatasetPipeline:
             drive_dataset_path (str): Path to dataset ZIP file in Google Drive
             image_size (tuple): Target image dimensions (height, width)
             batch_size (int): Batch size for training
+            extraction_mode (str): One of EXTRACTION_MODES
+            mmap_archive (bool): Memory-map the ZIP file in "zip" mode
+            tfrecord_dir (str): Directory of TFRecord shards written by write_tfrecords();
+                when it holds shards, create_datasets() reads from them
+            augment (bool): Augment the training split as a parallel tf.data stage
+                instead of inside the model
+            cache (str): None, "memory", or a directory for on-disk caches of the
+                decoded, resized images
+            prefetch (bool): Prefetch batches with AUTOTUNE
+            deterministic (bool): Keep the training element order reproducible;
+                False lets parallel stages hand out whichever element is ready
+            private_threadpool_size (int): Dedicated tf.data threads per dataset
+                (None shares TensorFlow's global pool)
+            hash_files (bool): Record a content hash of every image in the dataset index
+            image_store_dir (str): Directory of decoded uint8 arrays written by
+                write_image_store(); when it holds a store, create_datasets() reads from it
+            split_config (dict): Per-split overrides, e.g.
+                {"Validation": {"batch_size": 128}, "Testing": {"batch_size": 128}};
+                splits without an entry use image_size and batch_size
         """
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(
+                f"Unsupported extraction mode: {extraction_mode}. "
+                f"Choose from {list(EXTRACTION_MODES)}"
+            )
+
         self.drive_dataset_path = drive_dataset_path
         self.image_size = image_size
         self.batch_size = batch_size
+        self.extraction_mode = extraction_mode
+        self.mmap_archive = mmap_archive
+        self.tfrecord_dir = tfrecord_dir
+        self.augment = augment
+        self.cache = cache
+        self.prefetch = prefetch
+        self.deterministic = deterministic
+        self.private_threadpool_size = private_threadpool_size
+        self.hash_files = hash_files
+        self.image_store_dir = image_store_dir
+        self.split_config = split_config or {}
         self.main_dir = None
         self.class_names = None
         self.extraction_dir = "/content/drive/MyDrive/Datasets/Extracted Dataset"
 
+        # File listing of the extracted dataset, pickled with the pipeline
+        self.index = None
+
+        # Open archive handles for "zip" mode (never pickled)
+        self._archive = None
+        self._archive_file = None
+        self._archive_mmap = None
+        self._zip_index = None
+
         # Dataset objects and stats
         self.train_data = None
         self.val_data = None
@@ -55,13 +177,21 @@ class DatasetPipeline:
                 f"Dataset ZIP not found at: {self.drive_dataset_path}"
             )
 
+        # Stream straight from the archive; nothing is written to Drive
+        if self.extraction_mode == "zip":
+            return self._open_archive()
+
         # Create extraction directory if it doesn't exist
         os.makedirs(self.extraction_dir, exist_ok=True)
 
         # Extract dataset
-        print(f"Extracting dataset from {self.drive_dataset_path}...")
-        with zipfile.ZipFile(self.drive_dataset_path, "r") as zip_ref:
-            zip_ref.extractall(self.extraction_dir)
+        if self.extraction_mode == "incremental":
+            files_changed = self._extract_incremental() > 0
+        else:
+            print(f"Extracting dataset from {self.drive_dataset_path}...")
+            with zipfile.ZipFile(self.drive_dataset_path, "r") as zip_ref:
+                zip_ref.extractall(self.extraction_dir)
+            files_changed = True
 
         # Expected structure: Teeth_Dataset/Training, Teeth_Dataset/Validation, Teeth_Dataset/Testing
         self.main_dir = os.path.join(self.extraction_dir, "Teeth_Dataset")
@@ -78,42 +208,232 @@ class DatasetPipeline:
             )
 
         print(f"Dataset successfully extracted to: {self.main_dir}")
+        # Files overwritten in place do not change their directory's mtime
+        self._refresh_index(full=files_changed)
         return self.main_dir
 
+    def _refresh_index(self, full=False):
+        """Load or build the dataset index and bring it up to date."""
+        if self.index is None or self.index.root != self.main_dir:
+            self.index = DatasetIndex(
+                self.main_dir, SPLIT_DIRS, IMAGE_EXTENSIONS, with_hash=self.hash_files
+            )
+            self.index.load()
+        self.index.with_hash = self.hash_files
+
+        rescanned = self.index.refresh(full=full)
+        if rescanned:
+            print(f"Dataset index updated ({rescanned} directories rescanned)")
+        else:
+            print("Dataset index is up to date")
+
     def _validate_dataset_structure(self, directory):
         """Validate that directory contains required subdirectories."""
-        required_dirs = ["Training", "Validation", "Testing"]
-        return all(os.path.exists(os.path.join(directory, d)) for d in required_dirs)
+        return all(os.path.exists(os.path.join(directory, d)) for d in SPLIT_DIRS)
 
-    def analyze_dataset(self):
-        """Analyze dataset structure and provide statistics."""
-        if self.main_dir is None:
-            raise ValueError("Dataset not loaded. Call load_dataset() first.")
+    def _extract_incremental(self):
+        """
+        Extract only archive members that are missing or changed on disk.
 
-        train_dir = os.path.join(self.main_dir, "Training")
-        val_dir = os.path.join(self.main_dir, "Validation")
-        test_dir = os.path.join(self.main_dir, "Testing")
+        A manifest next to the extracted data records the archive signature and
+        each member's CRC. If the archive itself is unchanged and every
+        extracted file is still present at its recorded size, extraction is
+        skipped without reading any file contents.
 
-        # Count images efficiently
-        def count_images(directory):
-            return sum(
-                1
-                for f in Path(directory).rglob("*")
-                if f.suffix.lower() in [".png", ".jpg", ".jpeg", ".bmp", ".tiff"]
+        Returns:
+            int: Number of files written
+        """
+        manifest_path = os.path.join(self.extraction_dir, ".extraction_manifest.json")
+        archive_stat = os.stat(self.drive_dataset_path)
+        signature = [archive_stat.st_size, archive_stat.st_mtime_ns]
+
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+        if manifest.get("archive") == signature and self._extraction_intact(manifest["members"]):
+            print("Dataset archive unchanged since last extraction, skipping.")
+            return 0
+
+        members = manifest.get("members", {})
+        extracted = skipped = 0
+
+        print(f"Incrementally extracting dataset from {self.drive_dataset_path}...")
+        with zipfile.ZipFile(self.drive_dataset_path, "r") as zip_ref:
+            for info in zip_ref.infolist():
+                if info.is_dir():
+                    continue
+
+                expected = [info.CRC, info.file_size]
+                target = os.path.join(self.extraction_dir, info.filename)
+                if self._is_extracted(target, info, members.get(info.filename) == expected):
+                    members[info.filename] = expected
+                    skipped += 1
+                    continue
+
+                zip_ref.extract(info, self.extraction_dir)
+                members[info.filename] = expected
+                extracted += 1
+
+        with open(manifest_path, "w") as f:
+            json.dump({"archive": signature, "members": members}, f)
+
+        print(f"Extracted {extracted} files, {skipped} already up to date.")
+        return extracted
+
+    def _extraction_intact(self, members):
+        """Check that every recorded member is still on disk at its recorded size."""
+        for filename, (_, size) in members.items():
+            target = os.path.join(self.extraction_dir, filename)
+            try:
+                if os.path.getsize(target) != size:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    @staticmethod
+    def _is_extracted(target, info, recorded):
+        """Check whether an extracted file matches its archive member."""
+        if not os.path.exists(target) or os.path.getsize(target) != info.file_size:
+            return False
+        if recorded:
+            return True
+
+        # Extracted by an older run without a manifest: verify the CRC once
+        crc = 0
+        with open(target, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                crc = zlib.crc32(chunk, crc)
+        return crc == info.CRC
+
+    def _open_archive(self):
+        """Open the ZIP archive for streaming reads and index its image members."""
+        self._close_archive()
+
+        if self.mmap_archive:
+            self._archive_file = open(self.drive_dataset_path, "rb")
+            self._archive_mmap = mmap.mmap(
+                self._archive_file.fileno(), 0, access=mmap.ACCESS_READ
+            )
+            self._archive = zipfile.ZipFile(_MmapFile(self._archive_mmap))
+        else:
+            self._archive = zipfile.ZipFile(self.drive_dataset_path, "r")
+
+        # Only the central directory is read; cost does not depend on image data size
+        self._zip_index = {split: [] for split in SPLIT_DIRS}
+        for member_index, info in enumerate(self._archive.infolist()):
+            parts = info.filename.split("/")
+            # Expected member layout: Teeth_Dataset/<Split>/<Class>/<file>
+            if info.is_dir() or len(parts) < 4 or parts[0] != "Teeth_Dataset":
+                continue
+            if parts[1] in self._zip_index and info.filename.lower().endswith(
+                DECODABLE_EXTENSIONS
+            ):
+                self._zip_index[parts[1]].append((member_index, parts[2]))
+
+        missing = [split for split, members in self._zip_index.items() if not members]
+        if missing:
+            raise ValueError(
+                f"Invalid dataset structure in {self.drive_dataset_path}. "
+                f"No images found for: {', '.join(missing)}"
             )
 
-        train_count = count_images(train_dir)
-        val_count = count_images(val_dir)
-        test_count = count_images(test_dir)
+        # Virtual location inside the archive, so "dataset loaded" checks keep working
+        self.main_dir = os.path.join(self.drive_dataset_path, "Teeth_Dataset")
+        print(f"Streaming dataset directly from: {self.drive_dataset_path}")
+        return self.main_dir
 
-        # Get class information
-        classes = sorted(
-            [
-                d
-                for d in os.listdir(train_dir)
-                if os.path.isdir(os.path.join(train_dir, d))
-            ]
+    def _close_archive(self):
+        """Release archive handles opened in "zip" mode."""
+        if self._archive is not None:
+            self._archive.close()
+        if self._archive_mmap is not None:
+            self._archive_mmap.close()
+        if self._archive_file is not None:
+            self._archive_file.close()
+        self._archive = self._archive_file = self._archive_mmap = None
+
+    def _index_dataset(self, split_dir, shuffle, image_size, batch_size):
+        """Build a batched dataset from the files listed in the dataset index."""
+        paths, labels = self.index.files_and_labels(
+            split_dir, self.class_names, DECODABLE_EXTENSIONS
         )
+
+        def load_image(path, label):
+            image = tf.io.decode_image(
+                tf.io.read_file(path), channels=3, expand_animations=False
+            )
+            image = tf.image.resize(image, image_size)
+            image.set_shape((*image_size, 3))
+            return image, tf.one_hot(label, len(self.class_names))
+
+        dataset = tf.data.Dataset.from_tensor_slices((paths, labels))
+        if shuffle:
+            dataset = dataset.shuffle(len(paths), reshuffle_each_iteration=True)
+        dataset = dataset.map(load_image, num_parallel_calls=tf.data.AUTOTUNE)
+        dataset = dataset.batch(batch_size)
+
+        # Mirror the attributes image_dataset_from_directory sets
+        dataset.class_names = self.class_names
+        dataset.file_paths = paths
+        return dataset
+
+    def _zip_dataset(self, split_dir, shuffle, image_size, batch_size):
+        """Build a batched dataset that decodes images straight from the archive."""
+        if self._archive is None:
+            self._open_archive()
+
+        members = self._zip_index[split_dir]
+        class_to_index = {name: i for i, name in enumerate(self.class_names)}
+        member_indices = [member_index for member_index, _ in members]
+        labels = [class_to_index[class_name] for _, class_name in members]
+        infos = self._archive.infolist()
+
+        def read_member(member_index):
+            return self._archive.read(infos[int(member_index)])
+
+        def load_image(member_index, label):
+            data = tf.numpy_function(read_member, [member_index], tf.string)
+            image = tf.io.decode_image(data, channels=3, expand_animations=False)
+            image = tf.image.resize(image, image_size)
+            image.set_shape((*image_size, 3))
+            return image, tf.one_hot(label, len(self.class_names))
+
+        dataset = tf.data.Dataset.from_tensor_slices((member_indices, labels))
+        if shuffle:
+            dataset = dataset.shuffle(len(member_indices), reshuffle_each_iteration=True)
+        dataset = dataset.map(load_image, num_parallel_calls=tf.data.AUTOTUNE)
+        dataset = dataset.batch(batch_size)
+
+        # Mirror the attribute image_dataset_from_directory sets
+        dataset.class_names = self.class_names
+        return dataset
+
+    def analyze_dataset(self):
+        """Analyze dataset structure and provide statistics."""
+        if self.main_dir is None:
+            raise ValueError("Dataset not loaded. Call load_dataset() first.")
+
+        if self.extraction_mode == "zip":
+            if self._archive is None:
+                self._open_archive()
+
+            # Counts and classes come from the archive index, no file system walk
+            train_count = len(self._zip_index["Training"])
+            val_count = len(self._zip_index["Validation"])
+            test_count = len(self._zip_index["Testing"])
+            classes = sorted({name for _, name in self._zip_index["Training"]})
+        else:
+            if self.index is None:
+                self._refresh_index()
+
+            # Counts and classes come from the dataset index, no file system walk
+            train_count = self.index.count("Training")
+            val_count = self.index.count("Validation")
+            test_count = self.index.count("Testing")
+            classes = self.index.class_names("Training")
         self.class_names = classes
 
         self.stats = {
@@ -139,51 +459,341 @@ class DatasetPipeline:
 
         return self.stats
 
+    def split_settings(self, split):
+        """
+        Resolution and batch size of one split.
+
+        Returns:
+            tuple: (image_size, batch_size), with split_config overrides applied
+        """
+        settings = self.split_config.get(split, {})
+        return (
+            tuple(settings.get("image_size", self.image_size)),
+            settings.get("batch_size", self.batch_size),
+        )
+
     def create_datasets(self):
         """Create optimized TensorFlow datasets for training, validation, and testing."""
         if self.main_dir is None:
             raise ValueError("Dataset not loaded. Call load_dataset() first.")
 
-        # Dataset directories
-        train_dir = os.path.join(self.main_dir, "Training")
-        val_dir = os.path.join(self.main_dir, "Validation")
-        test_dir = os.path.join(self.main_dir, "Testing")
-
-        # Create datasets with optimizations
-        train_data = tf.keras.utils.image_dataset_from_directory(
-            train_dir,
-            labels="inferred",
-            label_mode="categorical",
-            class_names=['CaS', 'CoS', 'Gum', 'MC', 'OC', 'OLP', 'OT'],
-            image_size=self.image_size,
-            batch_size=self.batch_size,
-            shuffle=True,
+        self._prepare_source()
+        datasets = [self._create_split(split, *self.split_settings(split)) for split in SPLIT_DIRS]
+        return self._store_datasets(*datasets)
+
+    def training_dataset(self, image_size, batch_size=None, augment=None):
+        """
+        Training split at another resolution, e.g. one stage of progressive resizing.
+
+        Args:
+            image_size (tuple): (height, width) of the stage
+            batch_size (int): Defaults to the training split's batch size
+            augment (bool): Override the pipeline's augment setting, e.g. False for
+                un-augmented images to cache features or teacher logits from
+
+        Returns:
+            tf.data.Dataset: Optimized (and augmented, if enabled) training dataset
+        """
+        if self.main_dir is None:
+            raise ValueError("Dataset not loaded. Call load_dataset() first.")
+
+        self._prepare_source()
+        image_size = tuple(image_size)
+        batch_size = batch_size or self.split_settings("Training")[1]
+        dataset = self._create_split("Training", image_size, batch_size)
+        return self._optimize(dataset, "Training", image_size, batch_size, augment)
+
+    def _data_source(self):
+        """Where datasets are read from: "image_store", "tfrecord", "zip" or "index"."""
+        if self.image_store_dir and image_store.read_metadata(self.image_store_dir):
+            return "image_store"
+        if self.tfrecord_dir and tfrecord_io.read_metadata(self.tfrecord_dir):
+            return "tfrecord"
+        if self.extraction_mode == "zip":
+            return "zip"
+        return "index"
+
+    def _prepare_source(self):
+        """Resolve the class names of the data source and check them against the pipeline's."""
+        source = self._data_source()
+
+        if source == "image_store":
+            metadata = image_store.read_metadata(self.image_store_dir)
+            if self.class_names is not None and self.class_names != metadata["class_names"]:
+                raise ValueError(
+                    f"Image store in {self.image_store_dir} was written for classes "
+                    f"{metadata['class_names']}, expected {self.class_names}"
+                )
+            print(f"Reading decoded image store from: {self.image_store_dir}")
+        elif source == "tfrecord":
+            metadata = tfrecord_io.read_metadata(self.tfrecord_dir)
+            if self.class_names is not None and self.class_names != metadata["class_names"]:
+                raise ValueError(
+                    f"TFRecords in {self.tfrecord_dir} were written for classes "
+                    f"{metadata['class_names']}, expected {self.class_names}"
+                )
+            print(f"Reading TFRecord shards from: {self.tfrecord_dir}")
+        elif source == "zip":
+            if self._archive is None:
+                self._open_archive()
+            if self.class_names is None:
+                self.class_names = sorted({name for _, name in self._zip_index["Training"]})
+        else:
+            if self.index is None:
+                self._refresh_index()
+            if self.class_names is None:
+                self.class_names = self.index.class_names("Training")
+
+        return source
+
+    def _create_split(self, split, image_size, batch_size):
+        """Build the batched dataset of one split from the current data source."""
+        source = self._data_source()
+        shuffle = split == "Training"
+
+        if source == "image_store":
+            metadata = image_store.read_metadata(self.image_store_dir)
+            return image_store.load_split(
+                self.image_store_dir, split, metadata, image_size, batch_size, shuffle
+            )
+        if source == "tfrecord":
+            metadata = tfrecord_io.read_metadata(self.tfrecord_dir)
+            return tfrecord_io.load_split(
+                self.tfrecord_dir, split, metadata, image_size, batch_size, shuffle
+            )
+        if source == "zip":
+            return self._zip_dataset(split, shuffle, image_size, batch_size)
+        # File lists come from the dataset index instead of another directory walk
+        return self._index_dataset(split, shuffle, image_size, batch_size)
+
+    def _split_records(self, split_dir):
+        """List (read_bytes, label) pairs for every image of a split."""
+        class_to_index = {name: i for i, name in enumerate(self.class_names)}
+
+        if self.extraction_mode == "zip":
+            if self._archive is None:
+                self._open_archive()
+            infos = self._archive.infolist()
+            return [
+                (lambda info=infos[member_index]: self._archive.read(info), class_to_index[name])
+                for member_index, name in self._zip_index[split_dir]
+            ]
+
+        def read_file(path):
+            with open(path, "rb") as f:
+                return f.read()
+
+        if self.index is None:
+            self._refresh_index()
+        paths, labels = self.index.files_and_labels(
+            split_dir, self.class_names, DECODABLE_EXTENSIONS
         )
+        return [
+            (lambda path=path: read_file(path), label) for path, label in zip(paths, labels)
+        ]
+
+    def write_tfrecords(
+        self,
+        output_dir="/content/drive/MyDrive/Datasets/Teeth TFRecords",
+        storage="resized",
+        num_shards=None,
+    ):
+        """
+        One-time conversion of all splits into sharded TFRecord files.
 
-        val_data = tf.keras.utils.image_dataset_from_directory(
-            val_dir,
-            labels="inferred",
-            label_mode="categorical",
-            class_names=['CaS', 'CoS', 'Gum', 'MC', 'OC', 'OLP', 'OT'],
-            image_size=self.image_size,
-            batch_size=self.batch_size,
-            shuffle=False,
+        Afterwards create_datasets() reads a handful of large shards in parallel
+        instead of thousands of small image files every epoch.
+
+        Args:
+            output_dir (str): Destination directory for shards and metadata
+            storage (str): "resized" stores decoded uint8 pixels at self.image_size
+                (no decoding at train time), "encoded" keeps the original file bytes
+            num_shards (dict): Shards per split, defaults to DEFAULT_TFRECORD_SHARDS
+
+        Returns:
+            str: The TFRecord directory
+        """
+        if self.main_dir is None:
+            raise ValueError("Dataset not loaded. Call load_dataset() first.")
+        if storage not in tfrecord_io.STORAGE_FORMATS:
+            raise ValueError(
+                f"Unsupported storage: {storage}. Choose from {list(tfrecord_io.STORAGE_FORMATS)}"
+            )
+        if self.class_names is None:
+            self.analyze_dataset()
+
+        num_shards = {**DEFAULT_TFRECORD_SHARDS, **(num_shards or {})}
+        os.makedirs(output_dir, exist_ok=True)
+
+        splits = {}
+        for split in SPLIT_DIRS:
+            print(f"Writing {split} shards...")
+            records = tfrecord_io.write_split_shards(
+                self._split_records(split),
+                output_dir,
+                split,
+                num_shards[split],
+                storage,
+                self.image_size,
+                shuffle=(split == "Training"),
+            )
+            splits[split] = {"records": records, "shards": num_shards[split]}
+
+        tfrecord_io.write_metadata(
+            output_dir,
+            {
+                "class_names": self.class_names,
+                "image_size": list(self.image_size),
+                "storage": storage,
+                "splits": splits,
+            },
         )
 
-        test_data = tf.keras.utils.image_dataset_from_directory(
-            test_dir,
-            labels='inferred',
-            label_mode='categorical',
-            class_names=['CaS', 'CoS', 'Gum', 'MC', 'OC', 'OLP', 'OT'],
-            image_size=(256, 256),
-            batch_size=32,
-            shuffle=False
+        self.tfrecord_dir = output_dir
+        print(f"TFRecords written to: {output_dir}")
+        return output_dir
+
+    def write_image_store(self, output_dir="/content/image_store"):
+        """
+        One-time decode of all splits into memory-mapped uint8 arrays.
+
+        Each split becomes an N x height x width x 3 array plus a labels array,
+        so later epochs (and later runs) skip decoding and resizing entirely.
+        About 1 GB at 256x256 for the full dataset, so keep it on local disk.
+
+        Args:
+            output_dir (str): Destination directory for the arrays and metadata
+
+        Returns:
+            str: The image store directory
+        """
+        if self.main_dir is None:
+            raise ValueError("Dataset not loaded. Call load_dataset() first.")
+        if self.class_names is None:
+            self.analyze_dataset()
+
+        os.makedirs(output_dir, exist_ok=True)
+        metadata_path = os.path.join(output_dir, image_store.METADATA_FILE)
+        if os.path.exists(metadata_path):
+            os.remove(metadata_path)
+
+        splits = {}
+        for split in SPLIT_DIRS:
+            print(f"Decoding {split} images...")
+            splits[split] = {
+                "images": image_store.write_split(
+                    self._split_records(split),
+                    output_dir,
+                    split,
+                    self.image_size,
+                    shuffle=(split == "Training"),
+                )
+            }
+
+        # Metadata last: a store without it is incomplete and ignored
+        image_store.write_metadata(
+            output_dir,
+            {
+                "class_names": self.class_names,
+                "image_size": list(self.image_size),
+                "splits": splits,
+            },
         )
+
+        self.image_store_dir = output_dir
+        print(f"Image store written to: {output_dir}")
+        return output_dir
+
+    def _augment(self, dataset):
+        """
+        Apply random augmentation to a batched (images, labels) dataset.
+
+        Augmentation runs in parallel map calls and, with prefetching, overlaps
+        with the training step instead of running inside it.
+        """
+        augmentation = build_augmentation()
+        return dataset.map(
+            lambda images, labels: (augmentation(images, training=True), labels),
+            num_parallel_calls=tf.data.AUTOTUNE,
+        )
+
+    def _cache_path(self, split, image_size):
+        """
+        Cache file for a split at one resolution, or "" for an in-memory cache.
+
+        Every split is cached as single images, so the batch size is not part
+        of the key and a changed batch size never replays old batches.
+        """
+        if self.cache == "memory":
+            return ""
+        os.makedirs(self.cache, exist_ok=True)
+        height, width = image_size
+        return os.path.join(self.cache, f"{split}_{height}x{width}_images")
+
+    def _optimize(self, dataset, split, image_size, batch_size, augment=None):
+        """
+        Apply the performance profile (cache, augmentation, options, prefetch).
+
+        Cached images are stored as uint8, a quarter of the float32 size. Every
+        split is cached unbatched and batched after the cache; the training
+        split is also reshuffled there, so every epoch still sees a new order.
+        `augment` overrides self.augment.
+        """
+        training = split == "Training"
+        augment = self.augment if augment is None else augment
+        class_names = dataset.class_names
+        file_paths = getattr(dataset, "file_paths", None)
+        source = getattr(dataset, "source_metadata", None)
+        num_batches = len(dataset)
+
+        if self.cache:
+            dataset = dataset.map(
+                lambda images, labels: (tf.cast(tf.round(images), tf.uint8), labels),
+                num_parallel_calls=tf.data.AUTOTUNE,
+            )
+            dataset = dataset.unbatch().cache(self._cache_path(split, image_size))
+            if training:
+                dataset = dataset.shuffle(
+                    min(num_batches * batch_size, 2048), reshuffle_each_iteration=True
+                )
+            dataset = dataset.batch(batch_size)
+            dataset = dataset.apply(tf.data.experimental.assert_cardinality(num_batches))
+            dataset = dataset.map(
+                lambda images, labels: (tf.cast(images, tf.float32), labels),
+                num_parallel_calls=tf.data.AUTOTUNE,
+            )
+
+        if training and augment:
+            dataset = self._augment(dataset)
+
+        options = tf.data.Options()
+        options.deterministic = self.deterministic or not training
+        if self.private_threadpool_size:
+            options.threading.private_threadpool_size = self.private_threadpool_size
+        dataset = dataset.with_options(options)
+
+        if self.prefetch:
+            dataset = dataset.prefetch(tf.data.AUTOTUNE)
+
+        dataset.class_names = class_names
+        if file_paths is not None:
+            dataset.file_paths = file_paths
+        if source is not None:
+            dataset.source_metadata = source
+        return dataset
+
+    def _store_datasets(self, train_data, val_data, test_data):
+        """Keep the datasets on the pipeline and report their sizes."""
+        self.class_names = train_data.class_names
+        train_data, val_data, test_data = (
+            self._optimize(dataset, split, *self.split_settings(split))
+            for dataset, split in zip((train_data, val_data, test_data), SPLIT_DIRS)
+        )
+
         # Store datasets in pipeline
         self.train_data = train_data
         self.val_data = val_data
         self.test_data = test_data
-        self.class_names = train_data.class_names
 
         print(f"\nTensorFlow datasets created successfully!")
         print(f"Training batches: {len(train_data)}")
@@ -192,6 +802,40 @@ class DatasetPipeline:
 
         return train_data, val_data, test_data
 
+    def benchmark_input(self, split="Training", epochs=2):
+        """
+        Measure input-pipeline throughput with no model attached.
+
+        The first epoch includes decoding (and filling the cache, if enabled);
+        later epochs show the steady-state rate the model can be fed at.
+
+        Args:
+            split (str): One of SPLIT_DIRS
+            epochs (int): Full passes over the split
+
+        Returns:
+            list: Images per second for each epoch
+        """
+        datasets = dict(zip(SPLIT_DIRS, (self.train_data, self.val_data, self.test_data)))
+        dataset = datasets[split]
+        if dataset is None:
+            raise ValueError("No datasets available. Run create_datasets() first.")
+
+        throughput = []
+        for epoch in range(epochs):
+            images = 0
+            start = time.perf_counter()
+            for image_batch, _ in dataset:
+                images += int(image_batch.shape[0])
+            elapsed = time.perf_counter() - start
+            throughput.append(images / elapsed)
+            print(
+                f"{split} epoch {epoch + 1}: {images} images in {elapsed:.2f}s "
+                f"({throughput[-1]:.1f} images/sec)"
+            )
+
+        return throughput
+
     def visualize_samples(self, max_samples=12):
         """Visualize sample images from each class."""
         if self.train_data is None:
@@ -264,8 +908,30 @@ class DatasetPipeline:
         state["train_data"] = None
         state["val_data"] = None
         state["test_data"] = None
+        # Open file handles can't be pickled either; "zip" mode reopens on demand
+        state["_archive"] = None
+        state["_archive_file"] = None
+        state["_archive_mmap"] = None
         return state
 
     def __setstate__(self, state):
         """Custom method for unpickling"""
+        # Pipelines pickled before extraction modes existed behaved like "full"
+        state.setdefault("extraction_mode", "full")
+        state.setdefault("mmap_archive", False)
+        state.setdefault("tfrecord_dir", None)
+        # Older pipelines left augmentation to the model
+        state.setdefault("augment", False)
+        state.setdefault("cache", None)
+        state.setdefault("prefetch", False)
+        state.setdefault("deterministic", True)
+        state.setdefault("private_threadpool_size", None)
+        state.setdefault("hash_files", False)
+        state.setdefault("index", None)
+        state.setdefault("image_store_dir", None)
+        state.setdefault("split_config", {})
+        state.setdefault("_archive", None)
+        state.setdefault("_archive_file", None)
+        state.setdefault("_archive_mmap", None)
+        state.setdefault("_zip_index", None)
         self.__dict__.update(state)
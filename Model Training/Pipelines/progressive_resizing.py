@@ -0,0 +1,74 @@
+import tensorflow as tf
+
+
+def progressive_stages(epochs, image_sizes):
+    """
+    Split a number of epochs over increasing image sizes.
+
+    Epochs are shared out evenly; the remainder goes to the last (largest)
+    stages, and sizes left with zero epochs are skipped.
+
+    Returns:
+        list: (image_size, epochs) per stage
+    """
+    base, remainder = divmod(epochs, len(image_sizes))
+    first_extra = len(image_sizes) - remainder
+    stages = [
+        (tuple(size), base + (1 if i >= first_extra else 0))
+        for i, size in enumerate(image_sizes)
+    ]
+    return [(size, stage_epochs) for size, stage_epochs in stages if stage_epochs > 0]
+
+
+def fit_progressive(
+    model, train_data_for_size, val_data, epochs, image_sizes, callbacks=None, verbose=1
+):
+    """
+    Train with progressive resizing: low resolution first, full resolution last.
+
+    Early epochs at low resolution are several times cheaper, and the final
+    stage adapts the model to the full input size. The model must accept
+    variable input sizes, i.e. be built with input_shape=(None, None, 3), and
+    must not resize inputs to a fixed size inside the graph (create_transfer_learning_model
+    skips its 224x224 resize for such inputs).
+    Validation always runs on val_data as given (full resolution).
+
+    Args:
+        model (tf.keras.Model): Compiled model
+        train_data_for_size (callable): image_size -> training dataset, e.g.
+            DatasetPipeline.training_dataset
+        val_data (tf.data.Dataset): Validation dataset
+        epochs (int): Total epochs over all stages
+        image_sizes (list): Increasing (height, width) sizes, e.g.
+            [(160, 160), (192, 192), (224, 224), (256, 256)]
+        callbacks (list): Keras callbacks, reused by every stage
+        verbose (int): Verbosity passed to model.fit
+
+    Returns:
+        tf.keras.callbacks.History: Histories of all stages concatenated
+    """
+    history = tf.keras.callbacks.History()
+    history.history = {}
+    history.epoch = []
+    epoch = 0
+
+    for size, stage_epochs in progressive_stages(epochs, image_sizes):
+        print(f"📐 Training at {size[0]}x{size[1]} for epochs {epoch + 1}-{epoch + stage_epochs}")
+        stage = model.fit(
+            train_data_for_size(size),
+            validation_data=val_data,
+            initial_epoch=epoch,
+            epochs=epoch + stage_epochs,
+            callbacks=callbacks,
+            verbose=verbose,
+        )
+        for key, values in stage.history.items():
+            history.history.setdefault(key, []).extend(values)
+        history.epoch.extend(stage.epoch)
+        epoch += len(stage.epoch)
+
+        # EarlyStopping ends the whole run, not just the stage
+        if model.stop_training:
+            break
+
+    return history
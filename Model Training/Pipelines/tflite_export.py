@@ -0,0 +1,222 @@
+import os
+import resource
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+
+QUANTIZATION_VARIANTS = ("dynamic_range", "float16", "int8")
+
+MODEL_DEPLOYMENT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "Model Deployment"
+)
+
+
+def representative_dataset(dataset, num_samples=200):
+    """
+    Build a calibration generator for full-integer quantization.
+
+    Args:
+        dataset (tf.data.Dataset): Batched (images, labels) dataset, e.g. DatasetPipeline.val_data
+        num_samples (int): Number of single images yielded to the converter
+
+    Returns:
+        callable: Generator function in the format expected by TFLiteConverter
+    """
+
+    def generator():
+        yielded = 0
+        for images, _ in dataset:
+            for image in images:
+                yield [tf.cast(image[tf.newaxis], tf.float32)]
+                yielded += 1
+                if yielded >= num_samples:
+                    return
+
+    return generator
+
+
+def convert_to_tflite(model, variant, calibration_data=None):
+    """
+    Convert a Keras model to a quantized TFLite flatbuffer.
+
+    Args:
+        model (tf.keras.Model): Trained classifier
+        variant (str): One of QUANTIZATION_VARIANTS
+        calibration_data (callable): Representative dataset, required for 'int8'
+
+    Returns:
+        bytes: Serialized TFLite model
+    """
+    if variant not in QUANTIZATION_VARIANTS:
+        raise ValueError(
+            f"Unsupported variant: {variant}. Choose from {list(QUANTIZATION_VARIANTS)}"
+        )
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    if variant == "float16":
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == "int8":
+        if calibration_data is None:
+            raise ValueError("Full-integer quantization requires calibration_data.")
+        converter.representative_dataset = calibration_data
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        # Raw pixels are 0-255, so a uint8 input needs no rescaling on the client side
+        converter.inference_input_type = tf.uint8
+
+    return converter.convert()
+
+
+def export_tflite_variants(
+    model,
+    output_dir,
+    val_data,
+    model_name="efficientnetb0",
+    variants=QUANTIZATION_VARIANTS,
+    num_calibration_samples=200,
+):
+    """
+    Export every requested quantization variant of a model.
+
+    Args:
+        model (tf.keras.Model): Trained classifier
+        output_dir (str): Directory for the .tflite files
+        val_data (tf.data.Dataset): Validation split used for int8 calibration
+        model_name (str): Prefix of the exported file names
+        variants (tuple): Subset of QUANTIZATION_VARIANTS
+        num_calibration_samples (int): Images used to calibrate int8 ranges
+
+    Returns:
+        dict: Variant name -> exported file path
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    calibration_data = representative_dataset(val_data, num_calibration_samples)
+
+    paths = {}
+    for variant in variants:
+        print(f"Converting {variant} variant...")
+        tflite_model = convert_to_tflite(model, variant, calibration_data)
+
+        path = os.path.join(output_dir, f"{model_name}_{variant}.tflite")
+        with open(path, "wb") as f:
+            f.write(tflite_model)
+
+        paths[variant] = path
+        print(f"Saved {path} ({len(tflite_model) / 1e6:.1f} MB)")
+
+    return paths
+
+
+def _current_rss_mb():
+    """Resident set size of this process in MB (peak RSS where /proc is unavailable)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+
+
+def load_tflite_model(model_path, num_threads=None):
+    """
+    Load a .tflite file with the serving runtime, so evaluation matches deployment.
+
+    Returns:
+        TFLiteModel: Model Deployment/inference.py runner with predict_on_batch
+    """
+    if MODEL_DEPLOYMENT not in sys.path:
+        sys.path.insert(0, MODEL_DEPLOYMENT)
+    from inference import TFLiteModel
+
+    return TFLiteModel(model_path, num_threads=num_threads)
+
+
+def measure_latency_ms(predict_fn, image, iterations):
+    """Mean latency of predict_fn(image) in ms over `iterations` calls, after one warmup call."""
+    predict_fn(image)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        predict_fn(image)
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def evaluate_tflite_variants(keras_model, variant_paths, test_data, latency_iterations=50):
+    """
+    Compare quantized variants against the Keras model on the test split.
+
+    Args:
+        keras_model (tf.keras.Model): Float32 reference model
+        variant_paths (dict): Variant name -> .tflite path (from export_tflite_variants)
+        test_data (tf.data.Dataset): Batched, one-hot labelled test split
+        latency_iterations (int): Batch-1 calls used to time each model
+
+    Returns:
+        dict: Per-model accuracy, accuracy delta, batch-1 latency, file size and RSS growth
+    """
+    images, labels = [], []
+    for image_batch, label_batch in test_data:
+        images.append(image_batch.numpy())
+        labels.append(np.argmax(label_batch.numpy(), axis=1))
+    labels = np.concatenate(labels)
+    single_image = images[0][:1]
+
+    report = {}
+
+    rss_before = _current_rss_mb()
+    keras_preds = np.concatenate(
+        [np.argmax(keras_model.predict_on_batch(batch), axis=1) for batch in images]
+    )
+    keras_accuracy = float(np.mean(keras_preds == labels))
+    report["keras"] = {
+        "accuracy": keras_accuracy,
+        "accuracy_delta": 0.0,
+        "agreement_with_keras": 1.0,
+        "latency_ms": measure_latency_ms(
+            keras_model.predict_on_batch, single_image, latency_iterations
+        ),
+        "size_mb": None,
+        "rss_growth_mb": max(_current_rss_mb() - rss_before, 0.0),
+    }
+
+    for variant, path in variant_paths.items():
+        rss_before = _current_rss_mb()
+        runner = load_tflite_model(path)
+        preds = np.concatenate(
+            [np.argmax(runner.predict_on_batch(batch), axis=1) for batch in images]
+        )
+        accuracy = float(np.mean(preds == labels))
+
+        report[variant] = {
+            "accuracy": accuracy,
+            "accuracy_delta": accuracy - keras_accuracy,
+            "agreement_with_keras": float(np.mean(preds == keras_preds)),
+            "latency_ms": measure_latency_ms(
+                runner.predict_on_batch, single_image, latency_iterations
+            ),
+            "size_mb": os.path.getsize(path) / 1e6,
+            "rss_growth_mb": max(_current_rss_mb() - rss_before, 0.0),
+        }
+
+    return report
+
+
+def print_tflite_report(report):
+    """Print the comparison produced by evaluate_tflite_variants."""
+    print("\n" + "=" * 90)
+    print("TFLITE QUANTIZATION REPORT")
+    print("=" * 90)
+    print(
+        f"{'Model':<15} | {'Accuracy':>9} | {'Delta':>8} | {'Agree':>7} | "
+        f"{'Latency ms':>10} | {'Size MB':>8} | {'RSS +MB':>8}"
+    )
+    print("-" * 90)
+    for name, row in report.items():
+        size = f"{row['size_mb']:.1f}" if row["size_mb"] is not None else "-"
+        print(
+            f"{name:<15} | {row['accuracy']:>9.4f} | {row['accuracy_delta']:>+8.4f} | "
+            f"{row['agreement_with_keras']:>7.2%} | {row['latency_ms']:>10.2f} | "
+            f"{size:>8} | {row['rss_growth_mb']:>8.1f}"
+        )
+    print("=" * 90)
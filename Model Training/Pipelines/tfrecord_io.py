@@ -0,0 +1,176 @@
+import json
+import os
+import random
+
+import numpy as np
+import tensorflow as tf
+
+METADATA_FILE = "metadata.json"
+# "encoded" keeps the original JPEG/PNG bytes, "resized" stores decoded uint8 pixels
+STORAGE_FORMATS = ("encoded", "resized")
+
+
+def _bytes_feature(value):
+    return tf.train.Feature(bytes_list=tf.train.BytesList(value=[value]))
+
+
+def _int64_feature(value):
+    return tf.train.Feature(int64_list=tf.train.Int64List(value=[value]))
+
+
+def _decode_and_resize(data, image_size):
+    """Decode encoded image bytes and resize them like image_dataset_from_directory."""
+    image = tf.io.decode_image(data, channels=3, expand_animations=False)
+    return tf.image.resize(image, image_size)
+
+
+def serialize_example(image_bytes, label, storage, image_size):
+    """
+    Build one serialized tf.train.Example.
+
+    Args:
+        image_bytes (bytes): Encoded JPEG/PNG/BMP/GIF file contents
+        label (int): Class index
+        storage (str): One of STORAGE_FORMATS
+        image_size (tuple): Target (height, width) for "resized" storage
+
+    Returns:
+        bytes: Serialized example
+    """
+    if storage == "resized":
+        pixels = _decode_and_resize(image_bytes, image_size)
+        image_bytes = tf.cast(tf.round(pixels), tf.uint8).numpy().tobytes()
+
+    example = tf.train.Example(
+        features=tf.train.Features(
+            feature={
+                "image": _bytes_feature(image_bytes),
+                "label": _int64_feature(label),
+            }
+        )
+    )
+    return example.SerializeToString()
+
+
+def write_split_shards(
+    records, output_dir, split, num_shards, storage, image_size, shuffle=False, seed=42
+):
+    """
+    Write one split as `num_shards` TFRecord files.
+
+    Args:
+        records (list): (read_bytes, label) pairs, where read_bytes() returns encoded image bytes
+        output_dir (str): Destination directory
+        split (str): Split name used in the shard file names
+        num_shards (int): Number of shard files
+        storage (str): One of STORAGE_FORMATS
+        image_size (tuple): Target (height, width) for "resized" storage
+        shuffle (bool): Mix classes across shards (recommended for training data)
+        seed (int): Shuffle seed
+
+    Returns:
+        int: Number of records written
+    """
+    records = list(records)
+    if shuffle:
+        random.Random(seed).shuffle(records)
+
+    paths = [
+        os.path.join(output_dir, f"{split}-{i:05d}-of-{num_shards:05d}.tfrecord")
+        for i in range(num_shards)
+    ]
+    writers = [tf.io.TFRecordWriter(path) for path in paths]
+    try:
+        # Round-robin keeps shards the same size, so interleaved reads stay balanced
+        for i, (read_bytes, label) in enumerate(records):
+            writers[i % num_shards].write(
+                serialize_example(read_bytes(), label, storage, image_size)
+            )
+    finally:
+        for writer in writers:
+            writer.close()
+
+    return len(records)
+
+
+def write_metadata(output_dir, metadata):
+    with open(os.path.join(output_dir, METADATA_FILE), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def read_metadata(tfrecord_dir):
+    """Return the metadata written next to the shards, or None if there is none."""
+    path = os.path.join(tfrecord_dir, METADATA_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_split(tfrecord_dir, split, metadata, image_size, batch_size, shuffle):
+    """
+    Read one split back as a batched (images, one-hot labels) dataset.
+
+    Shards are read in parallel with interleave; for the training split the
+    read order is non-deterministic, which lets tf.data hand out whichever
+    shard is ready first.
+
+    Args:
+        tfrecord_dir (str): Directory containing the shards and metadata
+        split (str): Split name, e.g. "Training"
+        metadata (dict): Output of read_metadata
+        image_size (tuple): Output (height, width); resized on the fly if it differs
+        batch_size (int): Batch size
+        shuffle (bool): Shuffle shards and records (training split)
+
+    Returns:
+        tf.data.Dataset: Batched dataset with a known cardinality, class_names and
+            source_metadata
+    """
+    num_classes = len(metadata["class_names"])
+    stored_size = tuple(metadata["image_size"])
+    num_records = metadata["splits"][split]["records"]
+
+    files = tf.data.Dataset.list_files(
+        os.path.join(tfrecord_dir, f"{split}-*.tfrecord"), shuffle=shuffle
+    )
+    dataset = files.interleave(
+        lambda path: tf.data.TFRecordDataset(path, buffer_size=8 * 1024 * 1024),
+        cycle_length=tf.data.AUTOTUNE,
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not shuffle,
+    )
+    if shuffle:
+        dataset = dataset.shuffle(min(num_records, 2048), reshuffle_each_iteration=True)
+
+    feature_spec = {
+        "image": tf.io.FixedLenFeature([], tf.string),
+        "label": tf.io.FixedLenFeature([], tf.int64),
+    }
+
+    def parse(serialized):
+        example = tf.io.parse_single_example(serialized, feature_spec)
+        if metadata["storage"] == "resized":
+            image = tf.io.decode_raw(example["image"], tf.uint8)
+            image = tf.cast(tf.reshape(image, (*stored_size, 3)), tf.float32)
+            if stored_size != tuple(image_size):
+                image = tf.image.resize(image, image_size)
+        else:
+            image = _decode_and_resize(example["image"], image_size)
+        image.set_shape((*image_size, 3))
+        return image, tf.one_hot(example["label"], num_classes)
+
+    dataset = dataset.map(parse, num_parallel_calls=tf.data.AUTOTUNE)
+    dataset = dataset.batch(batch_size)
+
+    # Interleaved file reads hide the size; restore it so len(dataset) keeps working
+    num_batches = int(np.ceil(num_records / batch_size))
+    dataset = dataset.apply(tf.data.experimental.assert_cardinality(num_batches))
+    dataset.class_names = list(metadata["class_names"])
+    # Identifies the shards for cache signatures; the write time changes on regeneration
+    dataset.source_metadata = {
+        "format": "tfrecord",
+        "written": os.path.getmtime(os.path.join(tfrecord_dir, METADATA_FILE)),
+        **metadata,
+    }
+    return dataset
@@ -0,0 +1,184 @@
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+import tensorflow as tf
+
+
+class AsyncCheckpoint(tf.keras.callbacks.Callback):
+    """
+    Weights-only best-model checkpointing that never waits on slow storage.
+
+    On every improvement the weights are saved to fast local disk. A
+    background thread then copies the newest file to `filepath`, which can
+    be a network mount such as Google Drive. If several improvements pile up
+    while a copy is running, only the latest is copied. A failed copy is
+    reported right away and raised from on_train_end unless a later copy
+    succeeds; the local file is kept so the weights are not lost.
+    """
+
+    def __init__(self, filepath, local_dir=None, monitor="val_accuracy", mode="max", verbose=1):
+        """
+        Args:
+            filepath (str): Final destination, must end in ".weights.h5"
+            local_dir (str): Local staging directory (defaults to a new private temp directory)
+            monitor (str): Metric that decides what "best" means
+            mode (str): "max" or "min"
+            verbose (int): Print a line for every save and copy
+        """
+        super().__init__()
+        if not filepath.endswith(".weights.h5"):
+            raise ValueError(f"Weights-only checkpoints must end in .weights.h5, got {filepath}")
+
+        self.filepath = filepath
+        # A directory per callback, so concurrent runs never remove each other's files
+        self.local_dir = local_dir or tempfile.mkdtemp(prefix="checkpoints_")
+        self.monitor = monitor
+        self.mode = mode
+        self.verbose = verbose
+        self.best = -np.inf if mode == "max" else np.inf
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._error = None
+
+    def _improved(self, value):
+        return value > self.best if self.mode == "max" else value < self.best
+
+    def on_train_begin(self, logs=None):
+        self._error = None
+        os.makedirs(self.local_dir, exist_ok=True)
+        os.makedirs(os.path.dirname(self.filepath) or ".", exist_ok=True)
+        self._thread = threading.Thread(target=self._copy_worker, name="checkpoint-copy", daemon=True)
+        self._thread.start()
+
+    def on_epoch_end(self, epoch, logs=None):
+        value = (logs or {}).get(self.monitor)
+        if value is None or not self._improved(value):
+            return
+
+        stem = os.path.basename(self.filepath)[: -len(".weights.h5")]
+        # A new file per save, so the copier never reads a file that is being rewritten
+        local_path = os.path.join(self.local_dir, f"{stem}.epoch{epoch + 1:03d}.weights.h5")
+        self.model.save_weights(local_path)
+        if self.verbose:
+            print(
+                f"\nEpoch {epoch + 1}: {self.monitor} improved from {self.best:.5f} to "
+                f"{value:.5f}, saving weights to {local_path}"
+            )
+        self.best = value
+        self._queue.put(local_path)
+
+    def _copy_worker(self):
+        while True:
+            local_path = self._queue.get()
+            # Skip saves that have already been superseded
+            while local_path is not None and not self._queue.empty():
+                newer = self._queue.get()
+                os.remove(local_path)
+                local_path = newer
+            if local_path is None:
+                return
+
+            try:
+                # Copy-then-rename so the destination never holds a partial file
+                tmp_path = f"{self.filepath}.tmp"
+                shutil.copyfile(local_path, tmp_path)
+                os.replace(tmp_path, self.filepath)
+            except Exception as e:
+                # Keep the local file and let training continue; on_train_end raises
+                print(f"⚠️ Copying checkpoint {local_path} to {self.filepath} failed: {e!r}")
+                self._error = (local_path, e)
+                continue
+
+            self._error = None
+            os.remove(local_path)
+            if self.verbose:
+                print(f"Checkpoint copied to {self.filepath}")
+
+    def on_train_end(self, logs=None):
+        """Wait for the last copy, so the destination holds the best weights when fit() returns."""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            local_path, error = self._error
+            raise RuntimeError(
+                f"Best weights were not copied to {self.filepath}; they are still in {local_path}"
+            ) from error
+
+
+class EpochTimer(tf.keras.callbacks.Callback):
+    """
+    Break each epoch's wall time into input, compute, validation and callback time.
+
+    compute is the time spent inside train steps, input the time between
+    steps (waiting on the iterator and per-batch hooks), validation the
+    evaluation pass, and callbacks the epoch-end work of the other callbacks
+    (checkpointing, TensorBoard summaries, ...). Put this callback first in
+    the list so that all other epoch-end callbacks run after its own
+    on_epoch_end. An epoch's line is printed when the next epoch starts.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.epochs = []
+        self._current = None
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._report()
+        now = time.perf_counter()
+        self._current = {
+            "epoch": epoch + 1,
+            "start": now,
+            "input": 0.0,
+            "compute": 0.0,
+            "validation": 0.0,
+            "callbacks": 0.0,
+            "_batch_end": now,
+        }
+
+    def on_train_batch_begin(self, batch, logs=None):
+        now = time.perf_counter()
+        self._current["input"] += now - self._current["_batch_end"]
+        self._current["_batch_begin"] = now
+
+    def on_train_batch_end(self, batch, logs=None):
+        now = time.perf_counter()
+        self._current["compute"] += now - self._current["_batch_begin"]
+        self._current["_batch_end"] = now
+
+    def on_test_begin(self, logs=None):
+        if self._current is not None:
+            self._current["_test_begin"] = time.perf_counter()
+
+    def on_test_end(self, logs=None):
+        if self._current is not None and "_test_begin" in self._current:
+            self._current["validation"] += time.perf_counter() - self._current["_test_begin"]
+
+    def on_epoch_end(self, epoch, logs=None):
+        self._current["_epoch_end"] = time.perf_counter()
+
+    def on_train_end(self, logs=None):
+        self._report()
+
+    def _report(self):
+        """Close the previous epoch: everything after its on_epoch_end counts as callback time."""
+        current = self._current
+        if current is None or "_epoch_end" not in current:
+            return
+        now = time.perf_counter()
+        current["callbacks"] = now - current["_epoch_end"]
+        current["total"] = now - current["start"]
+        self.epochs.append({k: v for k, v in current.items() if not k.startswith("_") and k != "start"})
+        self._current = None
+
+        timing = self.epochs[-1]
+        print(
+            f"⏱️ Epoch {timing['epoch']}: {timing['total']:.1f}s total = "
+            f"input {timing['input']:.1f}s + compute {timing['compute']:.1f}s + "
+            f"validation {timing['validation']:.1f}s + callbacks {timing['callbacks']:.1f}s"
+        )
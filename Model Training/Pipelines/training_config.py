@@ -0,0 +1,120 @@
+import os
+import time
+
+import tensorflow as tf
+
+# "mixed_bfloat16" computes in bfloat16 and keeps float32 weights; the softmax
+# head stays float32 (see create_transfer_learning_model)
+PRECISION_POLICIES = ("float32", "mixed_bfloat16")
+
+
+class TrainingConfig:
+    """
+    Precision, compilation and threading settings for CPU training runs.
+
+    The dtype policy only affects layers created after apply(), so apply the
+    config before building the model. Thread counts can only be set before
+    TensorFlow executes its first op. oneDNN is read when TensorFlow is
+    imported, so it is controlled by TF_ENABLE_ONEDNN_OPTS (on by default on
+    x86 Linux since TF 2.9) and only reported here.
+    """
+
+    def __init__(
+        self,
+        precision="float32",
+        jit_compile=False,
+        intra_op_threads=None,
+        inter_op_threads=None,
+    ):
+        """
+        Args:
+            precision (str): One of PRECISION_POLICIES
+            jit_compile (bool): Compile the train step with XLA
+            intra_op_threads (int): Threads used inside a single op (None = TensorFlow default)
+            inter_op_threads (int): Ops run concurrently (None = TensorFlow default)
+        """
+        if precision not in PRECISION_POLICIES:
+            raise ValueError(
+                f"Unsupported precision: {precision}. Choose from {list(PRECISION_POLICIES)}"
+            )
+
+        self.precision = precision
+        self.jit_compile = jit_compile
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+
+    def apply(self):
+        """Apply the settings to the TensorFlow runtime."""
+        try:
+            if self.intra_op_threads:
+                tf.config.threading.set_intra_op_parallelism_threads(self.intra_op_threads)
+            if self.inter_op_threads:
+                tf.config.threading.set_inter_op_parallelism_threads(self.inter_op_threads)
+        except RuntimeError:
+            print("⚠️ TensorFlow is already running; thread settings apply after a restart.")
+
+        tf.keras.mixed_precision.set_global_policy(self.precision)
+
+        print(
+            f"⚙️ Training config: precision={self.precision}, jit_compile={self.jit_compile}, "
+            f"intra_op_threads={tf.config.threading.get_intra_op_parallelism_threads()}, "
+            f"inter_op_threads={tf.config.threading.get_inter_op_parallelism_threads()}, "
+            f"oneDNN={os.environ.get('TF_ENABLE_ONEDNN_OPTS', '1') != '0'}"
+        )
+
+    def check_model(self, model):
+        """Warn when the model was built under a different dtype policy."""
+        # The output layer is always float32, so look at the layer before it
+        compute_dtype = model.layers[-2].compute_dtype
+        expected = "bfloat16" if self.precision == "mixed_bfloat16" else "float32"
+        if compute_dtype != expected:
+            print(
+                f"⚠️ Model computes in {compute_dtype}, expected {expected}: "
+                "call apply() before creating the model."
+            )
+
+
+class StepThroughput(tf.keras.callbacks.Callback):
+    """
+    Record training steps/sec for every epoch.
+
+    Validation time is excluded. The rate is added to the epoch logs as
+    "steps_per_sec", so it ends up in the History object; callbacks see it
+    only if they run after this one, so list it before TensorBoard.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.steps_per_sec = []
+        self._start = None
+        self._train_time = None
+        self._steps = 0
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+        self._train_time = None
+        self._steps = 0
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._steps += 1
+
+    def on_test_begin(self, logs=None):
+        if self._start is not None and self._train_time is None:
+            self._train_time = time.perf_counter() - self._start
+
+    def on_epoch_end(self, epoch, logs=None):
+        train_time = self._train_time or (time.perf_counter() - self._start)
+        rate = self._steps / train_time
+        self.steps_per_sec.append(rate)
+        if logs is not None:
+            logs["steps_per_sec"] = rate
+
+    def summary(self, phase):
+        """Print the throughput of a phase; the first epoch includes tracing and compilation."""
+        if not self.steps_per_sec:
+            return
+        steady = self.steps_per_sec[1:] or self.steps_per_sec
+        print(
+            f"⏱️ {phase}: {sum(steady) / len(steady):.2f} steps/sec "
+            f"(first epoch {self.steps_per_sec[0]:.2f} steps/sec incl. compilation)"
+        )
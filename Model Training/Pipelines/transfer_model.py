@@ -0,0 +1,111 @@
+import tensorflow as tf
+from tensorflow.keras.applications import EfficientNetB0, MobileNetV2, ResNet50
+from tensorflow.keras.layers import BatchNormalization, Dense, Dropout, GlobalAveragePooling2D
+from tensorflow.keras.models import Model
+from tensorflow.keras.optimizers import Adam
+
+BASE_MODELS = {
+    "EfficientNetB0": EfficientNetB0,
+    "MobileNetV2": MobileNetV2,
+    "ResNet50": ResNet50,
+}
+
+# Model-specific input preprocessing, applied inside the graph on raw 0-255 pixels
+PREPROCESSING = {
+    "EfficientNetB0": tf.keras.applications.efficientnet.preprocess_input,
+    "MobileNetV2": tf.keras.applications.mobilenet_v2.preprocess_input,
+    "ResNet50": tf.keras.applications.resnet50.preprocess_input,
+}
+
+# Backbones whose ImageNet weights expect 224x224 inputs (EfficientNetB0 supports 256x256 natively)
+RESIZE_TO_224 = ("MobileNetV2", "ResNet50")
+
+
+def create_transfer_learning_model(
+    input_shape=(256, 256, 3),
+    num_classes=7,
+    base_model_name="EfficientNetB0",
+    weights="imagenet",
+    verbose=True,
+):
+    """
+    Create a transfer learning model for dental pathology classification.
+
+    Augmentation is not part of the model: DatasetPipeline applies it to the
+    training split as a parallel tf.data stage, so the saved model is
+    inference-only.
+
+    Args:
+        input_shape (tuple): Input image shape (height, width, channels); with
+            (None, None, 3) for progressive resizing the backbone runs at the
+            input resolution, so RESIZE_TO_224 backbones skip their resize
+        num_classes (int): Number of output classes
+        base_model_name (str): Pre-trained backbone, one of BASE_MODELS
+        weights (str): Backbone weights; None builds the same architecture
+            without downloading ImageNet weights (e.g. for benchmarks)
+        verbose (bool): Print a parameter summary
+
+    Returns:
+        tuple: (model, base_model) - the complete model and its backbone for fine-tuning
+    """
+    if base_model_name not in BASE_MODELS:
+        raise ValueError(
+            f"Unsupported model: {base_model_name}. Choose from {list(BASE_MODELS.keys())}"
+        )
+
+    # Input layer
+    inputs = tf.keras.layers.Input(shape=input_shape)
+    x = inputs
+
+    # Resize for backbones pre-trained at 224x224; for MobileNetV2 it also cuts the cost.
+    # Variable-size inputs are left alone, otherwise low-resolution stages would be upsampled
+    variable_size = input_shape[0] is None or input_shape[1] is None
+    if base_model_name in RESIZE_TO_224 and not variable_size:
+        x = tf.keras.layers.Resizing(224, 224)(x)
+
+    # Apply model-specific preprocessing
+    x = PREPROCESSING[base_model_name](x)
+
+    # Load pre-trained base model
+    base_model = BASE_MODELS[base_model_name](
+        weights=weights,
+        include_top=False,
+        input_tensor=x,
+    )
+
+    # Freeze base model initially
+    base_model.trainable = False
+
+    # Add custom classification head
+    x = base_model.output
+    x = GlobalAveragePooling2D()(x)
+    x = BatchNormalization()(x)
+    x = Dense(256, activation="relu")(x)  # Reduced size for efficiency
+    x = Dropout(0.5)(x)
+    x = Dense(128, activation="relu")(x)  # Adjusted for dataset size
+    x = BatchNormalization()(x)
+    x = Dropout(0.3)(x)
+    # Softmax in float32 keeps mixed-precision (bfloat16) training numerically stable
+    predictions = Dense(num_classes, activation="softmax", dtype="float32")(x)
+
+    # Create complete model
+    model = Model(inputs=inputs, outputs=predictions)
+
+    # Compile model
+    model.compile(
+        optimizer=Adam(learning_rate=0.001),
+        loss="categorical_crossentropy",
+        metrics=["accuracy", "Precision", "Recall"],  # Added for medical dataset
+    )
+
+    if verbose:
+        trainable = sum(tf.keras.backend.count_params(w) for w in model.trainable_weights)
+        print(f"✅ {base_model_name} Transfer Learning Model Created!")
+        print(f"📊 Total parameters: {model.count_params():,}")
+        print(f"🔧 Trainable parameters: {trainable:,}")
+        print(
+            "💡 For fine-tuning, unfreeze the top 20% of base_model layers "
+            "and train with a lower learning rate (e.g., 1e-5)."
+        )
+
+    return model, base_model